@@ -0,0 +1,25 @@
+import os
+import sys
+
+# Make sure we can find Backend files
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Prevent charmap encoding error on Windows console
+if sys.platform.startswith('win'):
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+try:
+    from core.db_core import DatabaseManager
+    db = DatabaseManager()
+    print("DatabaseManager loaded successfully.")
+except Exception as e:
+    print(f"Error loading DatabaseManager: {e}")
+    sys.exit(1)
+
+# One-off migration: the leaderboard is read through the stats.score index, so users whose stats were
+# written before stats.score existed need it stored once. Safe to re-run; only missing or stale scores are written.
+print("Backfilling leaderboard scores...")
+written = db.backfill_leaderboard_scores()
+print(f"Backfill complete ({written} users updated).")
@@ -1,9 +1,18 @@
 import os
+import asyncio
+import random
+import re
+import httpx
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterable, Tuple, NamedTuple
 import sys # For sys.exit on critical config error
-import json
+import orjson
+from functools import lru_cache
+from types import MappingProxyType
+from core.ttl_cache import LRUCache
 
 # Load environment variables
 load_dotenv()
@@ -15,34 +24,125 @@ if not ADZUNA_APP_ID or not ADZUNA_APP_KEY:
     print("❌ CRITICAL ERROR: Adzuna API credentials (ADZUNA_APP_ID, ADZUNA_APP_KEY) not found in .env file. Please configure them.")
     sys.exit(1) # Critical configuration, exit if not set
 
-def fetch_jobs(query: str, location: str = "India", results_per_page: int = 10) -> List[Dict[str, Any]]:
+class Job(NamedTuple):
+    """The subset of an Adzuna job listing the app uses, flattened at the API boundary."""
+    title: str
+    company: str
+    location: str
+    url: str
+    salary_min: Optional[float]
+    salary_max: Optional[float]
+    description: str
+
+def _to_job(raw: Dict[str, Any]) -> Job:
+    return Job(
+        title=raw.get("title") or "",
+        company=(raw.get("company") or {}).get("display_name") or "",
+        location=(raw.get("location") or {}).get("display_name") or "",
+        url=raw.get("redirect_url") or "",
+        salary_min=raw.get("salary_min"),
+        salary_max=raw.get("salary_max"),
+        description=raw.get("description") or "",
+    )
+
+def _parse_results(body: bytes) -> Tuple[Job, ...]:
+    return tuple(_to_job(raw) for raw in orjson.loads(body).get("results", []))
+
+# Caps concurrent Adzuna requests so fan-out across many skills doesn't trip rate limits
+ADZUNA_CONCURRENCY = int(os.getenv("ADZUNA_CONCURRENCY", "8"))
+ADZUNA_MAX_RETRIES = 3
+# Created lazily per event loop, like the shared client below (a semaphore binds to the loop it first waits on)
+_ADZUNA_SEM: Optional[asyncio.Semaphore] = None
+_SEM_LOOP: Optional[asyncio.AbstractEventLoop] = None
+
+def _get_semaphore() -> asyncio.Semaphore:
+    global _ADZUNA_SEM, _SEM_LOOP
+    loop = asyncio.get_running_loop()
+    if _ADZUNA_SEM is None or _SEM_LOOP is not loop:
+        _ADZUNA_SEM = asyncio.Semaphore(ADZUNA_CONCURRENCY)
+        _SEM_LOOP = loop
+    return _ADZUNA_SEM
+
+# Identical (skill, location) searches repeat across resume, job and assessment flows; cache them briefly.
+# Cached values are immutable Job tuples, so they can be shared between callers without copying.
+_ADZUNA_CACHE = LRUCache(max_size=500, ttl=600)
+
+# Pooled keep-alive session for the blocking code path (fetch_jobs_sync)
+_HTTP_SESSION = requests.Session()
+_HTTP_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=64,
+    max_retries=Retry(total=ADZUNA_MAX_RETRIES, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504), respect_retry_after_header=True),
+))
+_HTTP_SESSION.headers.update({"Connection": "keep-alive", "Accept-Encoding": "gzip"})
+
+# Shared HTTP/2 client (created lazily so it binds to the running event loop).
+# HTTP/2 multiplexes concurrent skill queries over a single TCP+TLS connection to Adzuna.
+_CLIENT: Optional[httpx.AsyncClient] = None
+_CLIENT_LOOP: Optional[asyncio.AbstractEventLoop] = None
+_CLIENT_LOCK: Optional[asyncio.Lock] = None
+_LOCK_LOOP: Optional[asyncio.AbstractEventLoop] = None
+
+async def get_client() -> httpx.AsyncClient:
     """
-    Fetches job listings from the Adzuna API based on a query and location.
-    
-    Args:
-        query (str): The search query (e.g., skill, job title).
-        location (str): The geographical location for the job search (e.g., "USA", "London", "India").
-        results_per_page (int): Number of results to fetch per page.
-        
-    Returns:
-        List[Dict[str, Any]]: A list of dictionaries, where each dictionary represents a job.
+    Returns the shared httpx client, creating it on first use.
+    A new client is created if the previous one was closed or belongs to another event loop
+    (e.g. when called from a script that uses asyncio.run more than once).
     """
-    
-    # Adzuna uses different endpoints for different countries/regions
-    # Simple mapping, can be expanded for more countries
-    country_code_map = {
-        "india": "in", "usa": "us", "united states": "us", "uk": "gb", 
-        "united kingdom": "gb", "canada": "ca", "australia": "au", "germany": "de",
-        "france": "fr", "spain": "es", "italy": "it", "brazil": "br"
-    }
-    # Normalize location to find country code, default to 'in'
-    lower_location = location.lower()
-    country_code = "in" # Default
-    for key, code in country_code_map.items():
-        if key in lower_location or lower_location.startswith(key):
-            country_code = code
-            break
-            
+    global _CLIENT, _CLIENT_LOOP, _CLIENT_LOCK, _LOCK_LOOP
+    loop = asyncio.get_running_loop()
+    if _CLIENT is not None and not _CLIENT.is_closed and _CLIENT_LOOP is loop:
+        return _CLIENT
+
+    if _CLIENT_LOCK is None or _LOCK_LOOP is not loop:
+        _CLIENT_LOCK = asyncio.Lock()
+        _LOCK_LOOP = loop
+    async with _CLIENT_LOCK:
+        if _CLIENT is None or _CLIENT.is_closed or _CLIENT_LOOP is not loop:
+            _CLIENT = httpx.AsyncClient(
+                http2=True,
+                timeout=15.0, # Increased timeout
+                limits=httpx.Limits(max_connections=64, max_keepalive_connections=32, keepalive_expiry=30),
+            )
+            _CLIENT_LOOP = loop
+    return _CLIENT
+
+async def close_client() -> None:
+    """Closes the shared httpx client (call on application shutdown)."""
+    global _CLIENT
+    if _CLIENT is not None and not _CLIENT.is_closed:
+        await _CLIENT.aclose()
+    _CLIENT = None
+
+# Adzuna uses different endpoints for different countries/regions
+# Simple mapping, can be expanded for more countries
+COUNTRY_CODE_MAP = MappingProxyType({
+    "india": "in", "usa": "us", "united states": "us", "uk": "gb",
+    "united kingdom": "gb", "canada": "ca", "australia": "au", "germany": "de",
+    "france": "fr", "spain": "es", "italy": "it", "brazil": "br"
+})
+DEFAULT_COUNTRY_CODE = "in"
+# Split once at import: single-word names resolve by token lookup, only the few multi-word names need a scan
+_SINGLE_WORD_COUNTRIES = {k: v for k, v in COUNTRY_CODE_MAP.items() if " " not in k}
+_MULTI_WORD_COUNTRIES = tuple((k, v) for k, v in COUNTRY_CODE_MAP.items() if " " in k)
+_LOCATION_TOKEN_RE = re.compile(r"[a-z]+")
+
+@lru_cache(maxsize=256)
+def _resolve_country(location: str) -> str:
+    """Maps a free-text location to an Adzuna country code, defaulting to 'in'."""
+    lower_location = location.strip().lower()
+    for key, code in _MULTI_WORD_COUNTRIES:
+        if key in lower_location:
+            return code
+    for token in _LOCATION_TOKEN_RE.findall(lower_location):
+        code = _SINGLE_WORD_COUNTRIES.get(token)
+        if code:
+            return code
+    return DEFAULT_COUNTRY_CODE
+
+def _build_request(query: str, location: str, results_per_page: int) -> Tuple[str, Dict[str, Any]]:
+    """Builds the Adzuna search URL and query parameters for a query/location pair."""
+    country_code = _resolve_country(location)
     url = f"https://api.adzuna.com/v1/api/jobs/{country_code}/search/1"
     params = {
         "app_id": ADZUNA_APP_ID,
@@ -52,11 +152,104 @@ def fetch_jobs(query: str, location: str = "India", results_per_page: int = 10)
         "where": location, # Adzuna can often use the location name for more specific searches
         "full_time": "1" # Example: Only full-time jobs. Adjust as needed.
     }
+    return url, params
+
+def _cache_key(query: str, location: str, results_per_page: int) -> Tuple[str, str, str, int]:
+    return (_resolve_country(location), query.strip().lower(), location.strip().lower(), results_per_page)
+
+def _retry_delay(attempt: int, headers: Any) -> float:
+    """Seconds to wait before retrying: honours Retry-After when present, else exponential backoff with jitter."""
+    retry_after = headers.get("Retry-After")
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass # HTTP-date form; fall back to backoff
+    delay = 2 ** attempt + random.random()
+    if headers.get("X-RateLimit-Remaining") == "0":
+        delay *= 2 # Quota window is exhausted, back off harder
+    return delay
+
+async def fetch_jobs(query: str, location: str = "India", results_per_page: int = 10) -> Tuple[Job, ...]:
+    """
+    Fetches job listings from the Adzuna API based on a query and location.
+    
+    Args:
+        query (str): The search query (e.g., skill, job title).
+        location (str): The geographical location for the job search (e.g., "USA", "London", "India").
+        results_per_page (int): Number of results to fetch per page.
+        
+    Returns:
+        Tuple[Job, ...]: The matching jobs; empty on any error.
+    """
+    
+    key = _cache_key(query, location, results_per_page)
+    cached = _ADZUNA_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    url, params = _build_request(query, location, results_per_page)
 
+    body = b""
     try:
-        response = requests.get(url, params=params, timeout=15) # Increased timeout
+        client = await get_client()
+        for attempt in range(ADZUNA_MAX_RETRIES + 1):
+            async with _get_semaphore():
+                response = await client.get(url, params=params)
+            body = response.content
+            status = response.status_code
+            if (status == 429 or status >= 500) and attempt < ADZUNA_MAX_RETRIES:
+                delay = _retry_delay(attempt, response.headers)
+                # Sleep outside the semaphore so other queries can use the slot meanwhile
+                print(f"Adzuna API returned {status} for '{query}' in '{location}'. Retrying in {delay:.1f}s (attempt {attempt + 1}/{ADZUNA_MAX_RETRIES})")
+                await asyncio.sleep(delay)
+                continue
+            response.raise_for_status() # Raise HTTPStatusError for bad responses (4xx or 5xx)
+            results = _parse_results(body)
+            _ADZUNA_CACHE.set(key, results)
+            return results
+    except httpx.HTTPStatusError as http_err:
+        print(f"Adzuna API HTTP Error for '{query}' in '{location}': {http_err} - {body.decode('utf-8', errors='replace')}")
+    except httpx.ConnectError as conn_err:
+        print(f"Adzuna API Connection Error for '{query}' in '{location}': {conn_err}")
+    except httpx.TimeoutException as timeout_err:
+        print(f"Adzuna API Timeout Error for '{query}' in '{location}': {timeout_err}")
+    except httpx.HTTPError as req_err:
+        print(f"Adzuna API Request Error for '{query}' in '{location}': {req_err}")
+    except orjson.JSONDecodeError:
+        print(f"Adzuna API: Failed to decode JSON response for '{query}' in '{location}'. Response: {body.decode('utf-8', errors='replace')}")
+        
+    return ()
+
+async def fetch_jobs_many(queries: Iterable[str], location: str = "India", results_per_page: int = 10) -> List[Tuple[str, Tuple[Job, ...]]]:
+    """
+    Fetches job listings for several queries concurrently.
+    
+    Returns:
+        List[Tuple[str, Tuple[Job, ...]]]: (query, results) pairs in the same order as `queries`.
+    """
+    queries = list(queries)
+    results = await asyncio.gather(*[fetch_jobs(q, location=location, results_per_page=results_per_page) for q in queries])
+    return list(zip(queries, results))
+
+def fetch_jobs_sync(query: str, location: str = "India", results_per_page: int = 10) -> Tuple[Job, ...]:
+    """
+    Blocking variant of `fetch_jobs` for legacy (non-async) callers.
+    Uses the pooled requests session so repeated calls reuse the same TCP/TLS connection.
+    """
+    key = _cache_key(query, location, results_per_page)
+    cached = _ADZUNA_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    url, params = _build_request(query, location, results_per_page)
+    response = None
+    try:
+        response = _HTTP_SESSION.get(url, params=params, timeout=15)
         response.raise_for_status() # Raise HTTPError for bad responses (4xx or 5xx)
-        return response.json().get("results", [])
+        results = _parse_results(response.content)
+        _ADZUNA_CACHE.set(key, results)
+        return results
     except requests.exceptions.HTTPError as http_err:
         print(f"Adzuna API HTTP Error for '{query}' in '{location}': {http_err} - {response.text}")
     except requests.exceptions.ConnectionError as conn_err:
@@ -65,7 +258,7 @@ def fetch_jobs(query: str, location: str = "India", results_per_page: int = 10)
         print(f"Adzuna API Timeout Error for '{query}' in '{location}': {timeout_err}")
     except requests.exceptions.RequestException as req_err:
         print(f"Adzuna API Request Error for '{query}' in '{location}': {req_err}")
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         print(f"Adzuna API: Failed to decode JSON response for '{query}' in '{location}'. Response: {response.text}")
-        
-    return []
\ No newline at end of file
+
+    return ()
@@ -2,10 +2,15 @@ from datetime import datetime
 from pathlib import Path
 import os
 import io
+import asyncio
 import sys
-import json
 import re
-from typing import Optional, Tuple, List, Dict, Any, Union
+import time
+import copy
+import hashlib
+import orjson
+from functools import lru_cache
+from typing import Optional, Tuple, List, Dict, Any, Union, Set
 from groq import Groq
 
 
@@ -23,40 +28,50 @@ from google.api_core import exceptions as google_exceptions
 # Setup (MODIFIED FOR FALLBACK)
 # =========================
 
-API_KEYS = []
+# Insertion-ordered dict used as an ordered set: O(1) dedup, stable key priority
+_API_KEYS_SET: Dict[str, None] = {}
+API_KEYS: List[str] = []
 MODEL_NAME = "gemini-2.5-flash"
-
-def setup_api_keys():
-    """Loads all available Gemini API keys from environment variables."""
-    global API_KEYS
-    # Try to find .env in current dir or parent dir
-    env_path = Path(__file__).resolve().parent.parent / '.env'
-    if env_path.exists():
-        print(f"DEBUG: Loading .env from {env_path}")
-        load_dotenv(dotenv_path=env_path)
+# Try to find .env in current dir or parent dir (resolved once per process)
+_ENV_PATH = Path(__file__).resolve().parent.parent / '.env'
+_ENV_EXISTS = _ENV_PATH.exists()
+
+@lru_cache(maxsize=1)
+def _load_keys() -> Tuple[str, ...]:
+    """Reads .env once and returns every configured Gemini key, deduplicated, in priority order."""
+    if _ENV_EXISTS:
+        print(f"DEBUG: Loading .env from {_ENV_PATH}")
+        load_dotenv(dotenv_path=_ENV_PATH)
     else:
-        print(f"DEBUG: .env not found at {env_path}, trying default load_dotenv()")
+        print(f"DEBUG: .env not found at {_ENV_PATH}, trying default load_dotenv()")
         load_dotenv()
-    
+
+    keys: List[str] = []
     # Support for comma-separated keys (Render friendly)
     multi_keys = os.getenv("GEMINI_API_KEYS")
     if multi_keys:
         parsed_keys = [k.strip() for k in multi_keys.split(',') if k.strip()]
-        API_KEYS.extend(parsed_keys)
+        keys.extend(parsed_keys)
         print(f"Loaded {len(parsed_keys)} keys from GEMINI_API_KEYS")
 
-    i = 1
-    while True:
-        key = os.getenv(f"GEMINI_API_KEY_{i}")
-        if i == 1 and not key:
-             key = os.getenv("GOOGLE_API_KEY") # Backward compatibility for the first key
+    # Numbered keys GEMINI_API_KEY_1..N, collected in a single pass over the environment
+    numbered: Dict[int, str] = {}
+    for name, value in os.environ.items():
+        if name.startswith("GEMINI_API_KEY_") and value:
+            suffix = name[len("GEMINI_API_KEY_"):]
+            if suffix.isdigit(): numbered[int(suffix)] = value
+    if 1 not in numbered and os.getenv("GOOGLE_API_KEY"):
+        numbered[1] = os.getenv("GOOGLE_API_KEY") # Backward compatibility for the first key
+    keys.extend(numbered[i] for i in sorted(numbered))
 
-        if key:
-            if key not in API_KEYS:
-                API_KEYS.append(key)
-            i += 1
-        else:
-            break
+    return tuple(dict.fromkeys(keys))
+
+def setup_api_keys():
+    """Loads all available Gemini API keys from environment variables."""
+    global API_KEYS
+    for key in _load_keys():
+        _API_KEYS_SET[key] = None
+    API_KEYS = list(_API_KEYS_SET)
     
     if not API_KEYS:
         print("CRITICAL ERROR: No 'GEMINI_API_KEY_1' or 'GOOGLE_API_KEY' found in environment variables.")
@@ -76,16 +91,46 @@ setup_api_keys()
 # NEW: Central API Call Function with Fallback Logic
 # =========================
 from core.gemini_handler import GeminiHandler
+from core.llm_cache import llm_cache
+from core.gemini_dispatcher import GeminiDispatcher
+from core.ttl_cache import LRUCache
+from core.ai_schemas import (
+    RESUME_BUNDLE_ADAPTER, FULL_RESUME_ANALYSIS_ADAPTER, ASSESSMENT_QUESTIONS_ADAPTER,
+    TUTOR_EXPLANATION_ADAPTER, CAREER_ROADMAP_ADAPTER, LINKEDIN_CONTENT_ADAPTER, GRADED_ANSWER_ADAPTER,
+)
+from pydantic import TypeAdapter, ValidationError
 
 # Initialize handler
 gemini_handler = GeminiHandler()
 
-def _call_gemini_with_fallback(prompt: str, is_chat: bool = False, history: List = None) -> Optional[Any]:
+# Bump whenever prompt templates change so stale cached answers are not reused
+PROMPT_VERSION = "v4"
+
+def _is_json_response(text: str) -> bool:
+    return _safe_json_loads(text) is not None
+
+@llm_cache(version=PROMPT_VERSION, model=MODEL_NAME, validate=_is_json_response)
+def _call_gemini_with_fallback(prompt: str, is_chat: bool = False, history: List = None, stream: bool = False, system_instruction: Optional[str] = None) -> Optional[Any]:
     """
     Calls the Gemini API using the centralized GeminiHandler with fallback mechanism.
     Wrapper to maintain compatibility with existing function calls.
+    `stream=True` is used for the large-schema generations (roadmap, full analysis).
+    `system_instruction` takes a prompt's static preamble (a module constant) so every call starts with the
+    same prefix and Gemini's implicit context caching can skip re-processing it; `prompt` holds only the
+    per-call part.
+    `cache=True` (consumed by @llm_cache) opts a deterministic extraction call into the response cache.
     """
-    return gemini_handler.call_gemini(prompt, is_chat, history)
+    return gemini_handler.call_gemini(prompt, is_chat=is_chat, history=history, stream=stream, system_instruction=system_instruction)
+
+# Shared dispatcher for async callers: independent prompts from concurrent requests run in worker threads
+# under one process-wide concurrency limit (see core/gemini_dispatcher.py)
+gemini_dispatcher = GeminiDispatcher(_call_gemini_with_fallback)
+
+async def call_gemini_batch(prompts: List[str]) -> List[Optional[Any]]:
+    """
+    Issues several independent Gemini prompts concurrently and returns the responses in prompt order.
+    """
+    return await gemini_dispatcher.submit_many(prompts)
 
 # =========================
 # JSON Schema Constants (Your code - UNCHANGED)
@@ -159,69 +204,178 @@ FULL_RESUME_ANALYSIS_SCHEMA = """
 # =========================
 # Helper Functions (Your code - UNCHANGED)
 # =========================
+# Markdown-fenced JSON (```json ... ```) and, failing that, the outermost object/array in free text
+_FENCE_RE = re.compile(r"```(?:json)?\s*(\{.*\}|\[.*\])\s*```", re.DOTALL | re.IGNORECASE)
+_OBJ_RE = re.compile(r"[\{\[].*[\}\]]", re.DOTALL)
+# Deletion table for markdown emphasis characters; str.translate strips them in a single C-level pass
+_MARKDOWN_STRIP_TABLE = str.maketrans('', '', '*_`')
+
+def _unfence(s: str) -> str:
+    """Slices off a ```/```json fence wrapping the whole text; returns the text unchanged (no copy) otherwise."""
+    start = 0
+    while start < len(s) and s[start].isspace(): start += 1
+    if not s.startswith("```", start): return s
+    end = s.rfind("```")
+    if end <= start: return s
+    body_start = s.find("\n", start)
+    if body_start == -1 or body_start > end: return s
+    return s[body_start + 1:end]
+
 def _safe_json_loads(s: str, fallback=None):
     if not s: return fallback
-    s = s.strip()
-    if s.startswith("```json"): s = s[7:]
-    if s.endswith("```"): s = s[:-3]
-    s = s.strip()
     try:
-        return json.loads(s)
-    except json.JSONDecodeError:
-        m = re.search(r"\{.*\}", s, flags=re.DOTALL)
-        if m:
-            try: return json.loads(m.group(0))
-            except json.JSONDecodeError: return fallback
+        return orjson.loads(s)
+    except orjson.JSONDecodeError:
+        pass
+    unfenced = _unfence(s)
+    if unfenced is not s:
+        try: return orjson.loads(unfenced)
+        except orjson.JSONDecodeError: pass
+    m = _FENCE_RE.search(s)
+    if m:
+        try: return orjson.loads(m.group(1))
+        except orjson.JSONDecodeError: pass
+    m = _OBJ_RE.search(s)
+    if m:
+        try: return orjson.loads(m.group(0))
+        except orjson.JSONDecodeError: pass
     return fallback
 
+def _response_text(response: Optional[Any]) -> Optional[str]:
+    """Reads `.text` once (SDK responses decode it lazily and raise on blocked output); None if unavailable."""
+    if response is None: return None
+    try:
+        return response.text
+    except Exception:
+        return None
+
+def _compact_json(obj: Any) -> str:
+    """Serializes `obj` for embedding in a prompt: compact (no indent) to keep token counts down."""
+    return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+
+# Retry-with-feedback for structured outputs: an unparsable or off-schema response is retried with the
+# validation error appended to the prompt, backing off 1s, 2s, ... between attempts.
+VALIDATION_MAX_RETRIES = 2
+VALIDATION_BACKOFF_SECONDS = 1.0
+
+def _validation_error_summary(e: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(map(str, err['loc'])) or 'root'}: {err['msg']}" for err in e.errors()[:5])
+
+def _parse_validated(response: Optional[Any], adapter: TypeAdapter) -> Tuple[Optional[Any], Optional[str]]:
+    """Returns (data, None) for a valid response, (None, error) for a retryable one, (None, None) if there was no response."""
+    if not response: return None, None # Every key and the fallback already failed; retrying won't help
+    data = _safe_json_loads(response.text, fallback=None)
+    if data is None: return None, "output was not valid JSON"
+    try:
+        return adapter.dump_python(adapter.validate_python(data)), None
+    except ValidationError as e:
+        return None, _validation_error_summary(e)
+
+def _with_feedback(prompt: str, error: str) -> str:
+    return f"{prompt}\n\nPrevious output had error: {error}. Return valid JSON matching the schema."
+
+def _validated_call(prompt: str, adapter: TypeAdapter, max_retries: int = VALIDATION_MAX_RETRIES, **call_kwargs) -> Optional[Any]:
+    """
+    Calls Gemini and returns the response parsed and validated against `adapter`, or None.
+    Blocks on the SDK and on time.sleep between retries: only for sync callers that run in a worker thread
+    (asyncio.to_thread) or outside the server. Request handlers use `_validated_call_async`.
+    """
+    attempt_prompt = prompt
+    for attempt in range(max_retries + 1):
+        data, error = _parse_validated(_call_gemini_with_fallback(attempt_prompt, **call_kwargs), adapter)
+        if error is None: return data
+        if attempt < max_retries:
+            print(f"⚠️ Invalid AI output ({error}). Retrying with feedback ({attempt + 1}/{max_retries})...")
+            time.sleep(VALIDATION_BACKOFF_SECONDS * 2 ** attempt)
+            attempt_prompt = _with_feedback(prompt, error)
+    return None
+
+async def _validated_call_async(prompt: str, adapter: TypeAdapter, max_retries: int = VALIDATION_MAX_RETRIES, **call_kwargs) -> Optional[Any]:
+    """Async counterpart of `_validated_call`, submitted through the shared Gemini dispatcher."""
+    attempt_prompt = prompt
+    for attempt in range(max_retries + 1):
+        data, error = _parse_validated(await gemini_dispatcher.submit(attempt_prompt, **call_kwargs), adapter)
+        if error is None: return data
+        if attempt < max_retries:
+            print(f"⚠️ Invalid AI output ({error}). Retrying with feedback ({attempt + 1}/{max_retries})...")
+            await asyncio.sleep(VALIDATION_BACKOFF_SECONDS * 2 ** attempt)
+            attempt_prompt = _with_feedback(prompt, error)
+    return None
+
 def _norm(s: Optional[str]) -> bool:
     return bool(s and s.strip())
 
 def _smart_join(parts: List[Optional[str]]) -> str:
     return " | ".join([str(p) for p in parts if _norm(p)])
 
+def _normalize_section_key(key: str) -> str:
+    return key.strip().lower().replace(" ", "_").replace("-", "_")
+
+@lru_cache(maxsize=32)
+def _normalize_keys(keys: Tuple[str, ...]) -> Dict[str, str]:
+    """Maps normalized section key -> original key (first occurrence wins)."""
+    norm_map: Dict[str, str] = {}
+    for k in keys:
+        norm_map.setdefault(_normalize_section_key(k), k)
+    return norm_map
+
 def _best_section_key(target_key: str, available_keys: List[str]) -> Optional[str]:
     if not target_key: return None
-    t = target_key.strip().lower().replace(" ", "_").replace("-", "_")
-    for k in available_keys:
-        k_norm = k.lower().replace(" ", "_")
-        if t == k_norm or t in k_norm or k_norm in t: return k
+    return _best_section_key_cached(_normalize_section_key(target_key), tuple(available_keys))
+
+# Memoized on (normalized target, keys in resume order); users typically retry the same section of the same resume.
+# Keys are not sorted: the substring fallback returns the first match in resume order.
+@lru_cache(maxsize=1024)
+def _best_section_key_cached(t: str, available_keys: Tuple[str, ...]) -> Optional[str]:
+    norm_map = _normalize_keys(available_keys)
+    exact = norm_map.get(t)
+    if exact is not None: return exact
+    for k_norm, k in norm_map.items():
+        if t in k_norm or k_norm in t: return k
     return None
 
+@lru_cache(maxsize=256)
 def parse_user_optimization_input(inp: str) -> Tuple[Optional[str], Optional[str]]:
     val = (inp or "").strip()
     if not val: return None, None
     if ":" in val:
-        left, right = val.split(":", 1); return _norm(left), _norm(right)
+        left, right = val.split(":", 1); return left.strip() or None, right.strip() or None
     if len(val.split()) == 1:
         return val, None
     return None, val
 
 def _stringify_list_content(content: Any) -> str:
     if not isinstance(content, list): return str(content or "")
+    # Fast path: the common list[str] case (bullets, strengths, recommendations) needs no per-item dispatch
+    if all(type(item) is str for item in content): return "\n".join(content)
     string_parts = []
     for item in content:
         if isinstance(item, str): string_parts.append(item)
         elif isinstance(item, dict):
-            string_parts.append(", ".join([f"{k.replace('_', ' ').title()}: {v}" for k, v in item.items()]))
+            string_parts.append(", ".join(f"{k.replace('_', ' ').title()}: {v}" for k, v in item.items()))
         else: string_parts.append(str(item))
     return "\n".join(string_parts)
 
+def _iter_docx_text(doc: Document):
+    """Yields non-empty paragraph texts, then one ' | '-joined line per non-empty table row."""
+    for p in doc.paragraphs:
+        text = p.text
+        if text and text.strip(): yield text
+    for table in doc.tables:
+        for row in table.rows:
+            row_text = " | ".join(t for t in (cell.text for cell in row.cells) if t and t.strip())
+            if row_text: yield row_text
+
 def extract_text_auto(file_content: bytes, file_extension: str) -> Optional[str]:
+    """Blocking (CPU-bound parsing); async routes call it via asyncio.to_thread."""
     print(f"DEBUG(ai_core): extract_text_auto called for in-memory content (Type: {file_extension})")
     try:
         if file_extension == ".pdf":
+            # Each call opens its own document, so concurrent calls from worker threads don't share PyMuPDF state
             with fitz.open(stream=file_content, filetype="pdf") as doc: 
-                return "\n".join([page.get_text() for page in doc])
+                return "\n".join([page.get_text("text", sort=False) for page in doc])
         elif file_extension == ".docx":
-            doc = Document(io.BytesIO(file_content))
-            chunks = [p.text for p in doc.paragraphs if _norm(p.text)]
-            if doc.tables:
-                for table in doc.tables:
-                    for row in table.rows:
-                        cells_for_chunk = [cell.text for cell in row.cells if _norm(cell.text)]
-                        if cells_for_chunk: chunks.append(" | ".join(cells_for_chunk))
-            return "\n".join(chunks)
+            return "\n".join(_iter_docx_text(Document(io.BytesIO(file_content))))
         elif file_extension == ".txt":
              return file_content.decode('utf-8', errors='ignore')
         else:
@@ -234,94 +388,175 @@ def extract_text_auto(file_content: bytes, file_extension: str) -> Optional[str]
 # API Functions (MODIFIED TO USE FALLBACK)
 # ============================================
 
-def get_resume_structure(resume_text: str) -> Optional[Dict[str, Any]]:
-    prompt = f"""
-You are an expert HR Technology engineer specializing in resume data extraction. Your task is to convert the raw text of a resume into a structured, valid JSON object, capturing ALL information with high fidelity.
-**Instructions:**
+_RESUME_BUNDLE_INSTRUCTIONS = """
+You are an expert HR Technology engineer and technical recruiter specializing in resume data extraction.
+From the raw resume text below, produce ONE valid JSON object with exactly two top-level keys: "structure" and "skills".
+
+**Part 1 - "structure": convert the resume into structured JSON, capturing ALL information with high fidelity.**
 1.  **Use the Base Schema:** For common sections, use the following schema.
-2.  **Capture Everything Else:** If you find other sections that do not fit the schema (e.g., "Achievements", "Leadership"), create a new top-level key for them (e.g., "achievements").
-3.  **IGNORE THE SKILLS SECTION:** Do not parse the skills section in this step. It will be handled by a different process. Omit the 'skills' key from your output.
+2.  **Capture Everything Else:** If you find other sections that do not fit the schema (e.g., "Achievements", "Leadership"), create a new top-level key for them inside "structure" (e.g., "achievements").
+3.  **No Skills Here:** Do not put the skills section under "structure"; skills go only under "skills".
+4.  If a section from the base schema is NOT in the resume, YOU MUST OMIT ITS KEY. Do not create empty sections.
 **Base Schema:**
-{{
-  "personal_info": {{ "name": "string", "email": "string", "phone": "string", "linkedin": "string", "github": "string" }},
+{
+  "personal_info": { "name": "string", "email": "string", "phone": "string", "linkedin": "string", "github": "string" },
   "summary": "string",
-  "work_experience": [ {{ "role": "string", "company": "string", "duration": "string", "description": ["string", ...] }} ],
-  "internships": [ {{ "role": "string", "company": "string", "duration": "string", "description": ["string", ...] }} ],
-  "education": [ {{ "institution": "string", "degree": "string", "duration": "string", "description": ["string", ...] }} ],
-  "projects": [ {{ "title": "string", "description": ["string", ...] }} ],
-  "certifications": [ {{ "name": "string", "description": "string" }} ]
-}}
-**Critical Rules:**
-- If a section from the base schema is NOT in the resume, YOU MUST OMIT ITS KEY from the final JSON. Do not create empty sections.
-- Your final output must be a single, valid JSON object starting with `{{` and ending with `}}`. Do not include markdown.
---- RESUME TEXT ---
-{resume_text}
---- END RESUME TEXT ---
-"""
-    response = _call_gemini_with_fallback(prompt)
-    if not response: return None
-    data = _safe_json_loads(response.text, fallback=None)
-    if not data:
-        print("\n--- ERROR: GEMINI API FAILED TO RETURN VALID JSON (STRUCTURE) ---")
-        return None
-    return data
-
-def categorize_skills_from_text(resume_text: str) -> Optional[Dict[str, List[str]]]:
-    prompt = f"""
-You are an expert technical recruiter and data analyst.
-Your sole job is to scan the entire resume text provided and identify only the most relevant, concrete skills.
+  "work_experience": [ { "role": "string", "company": "string", "duration": "string", "description": ["string", ...] } ],
+  "internships": [ { "role": "string", "company": "string", "duration": "string", "description": ["string", ...] } ],
+  "education": [ { "institution": "string", "degree": "string", "duration": "string", "description": ["string", ...] } ],
+  "projects": [ { "title": "string", "description": ["string", ...] } ],
+  "certifications": [ { "name": "string", "description": "string" } ]
+}
 
-**Instructions:**
+**Part 2 - "skills": identify only the most relevant, concrete skills.**
 1. All skills explicitly listed in the "Skills" section must be extracted without omission.
 2. Additionally, extract other skills if they are explicitly mentioned in experience, projects, education, or certifications.
 3. Do not infer or assume skills that are not explicitly stated in the resume.
 4. Ignore trivial or non-relevant abilities (e.g., "MS Office", "Internet browsing", unless they are in the Skills section).
-5. Categorize the skills into the predefined keys in the JSON schema below.
-6. Place each skill in the single most appropriate category.
-7. Exclude duplicate or overlapping skills.
-8. If a category has no skills, omit the key from the output.
-
-**JSON Output Schema:**
-{{
+5. Place each skill in the single most appropriate category below; exclude duplicate or overlapping skills.
+6. If a category has no skills, omit the key.
+**Skills Schema:**
+{
     "Programming Languages": ["Python", "JavaScript", "Java", "C++", ...],
     "Frameworks and Libraries": ["TensorFlow", "PyTorch", "React", "Node.js", "Pandas", ...],
     "Databases": ["MySQL", "PostgreSQL", "MongoDB", ...],
     "Tools and Platforms": ["Git", "Docker", "AWS", "Jira", "Linux", ...],
     "Data Science": ["Machine Learning", "NLP", "Data Visualization", "Predictive Modeling", ...],
     "Soft Skills": ["Leadership", "Teamwork", "Communication", "Problem Solving", ...]
-}}
+}
 
 **Critical Rules:**
-- Output ONLY the valid JSON object described above.
+- Your final output must be a single, valid JSON object of the form { "structure": {...}, "skills": {...} }.
 - Do not add explanations or markdown.
-
---- RESUME TEXT ---
-{resume_text}
---- END RESUME TEXT ---
 """
-    response = _call_gemini_with_fallback(prompt)
-    if not response: return None
-    data = _safe_json_loads(response.text, fallback=None)
-    if not data:
-        print("\n--- ERROR: GEMINI FAILED TO INFER SKILLS ---")
-        return None
-    return data
 
+def _resume_bundle_prompt(resume_text: str) -> str:
+    return f"--- RESUME TEXT ---\n{resume_text}\n--- END RESUME TEXT ---\n"
 
-def optimize_resume_json(resume_json: Dict[str, Any], user_input: str, job_description: Optional[str] = None) -> Dict[str, Any]:
-    section_req, instruction = parse_user_optimization_input(user_input)
-    keys_present = list(resume_json.keys())
-    
-    job_desc_context = ""
-    if job_description and job_description.strip():
-        job_desc_context = f"""
-        **Job Description Context:**
-        Below is the job description for which the resume is being optimized. Incorporate keywords, desired skills, and align the achievements to the requirements of this role.
-        ```
-        {job_description}
-        ```
-        """
-    base_prompt_context = f"""
+def _split_resume_bundle(data: Optional[Dict[str, Any]]) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, List[str]]]]:
+    if not data:
+        print("\n--- ERROR: GEMINI API FAILED TO RETURN VALID JSON (STRUCTURE + SKILLS) ---")
+        return None, None
+    structure = data.get("structure") or None
+    skills = data.get("skills") or None
+    if not structure: print("\n--- ERROR: GEMINI API FAILED TO RETURN VALID JSON (STRUCTURE) ---")
+    if not skills: print("\n--- ERROR: GEMINI FAILED TO INFER SKILLS ---")
+    return structure, skills
+
+# Resumes whose estimated size (~4 chars per token) exceeds this are split into chunks that are structured
+# separately and merged, so neither the prompt nor the (larger) structured output gets silently truncated.
+RESUME_CHUNK_TOKEN_LIMIT = int(os.getenv("RESUME_CHUNK_TOKEN_LIMIT", "12000"))
+_PARAGRAPH_SPLIT_RE = re.compile(r"\n\s*\n")
+
+def _estimate_tokens(text: str) -> int:
+    return len(text) // 4
+
+def _chunk_resume_text(resume_text: str, token_limit: int = RESUME_CHUNK_TOKEN_LIMIT) -> List[str]:
+    """Packs whole paragraphs (sections are blank-line separated) into chunks under `token_limit`."""
+    if _estimate_tokens(resume_text) <= token_limit: return [resume_text]
+    max_chars = token_limit * 4
+    chunks: List[str] = []
+    current: List[str] = []
+    size = 0
+    for para in _PARAGRAPH_SPLIT_RE.split(resume_text):
+        # A single paragraph larger than a chunk is hard-split
+        while len(para) > max_chars:
+            chunks.append(para[:max_chars])
+            para = para[max_chars:]
+        if current and size + len(para) > max_chars:
+            chunks.append("\n\n".join(current))
+            current, size = [], 0
+        current.append(para)
+        size += len(para) + 2
+    if current: chunks.append("\n\n".join(current))
+    return chunks
+
+def _merge_resume_bundles(parts: List[Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+    """Merges per-chunk results: list sections are concatenated, dict fields filled first-wins, skills unioned."""
+    parts = [p for p in parts if p]
+    if not parts: return None
+    structure: Dict[str, Any] = {}
+    skills: Dict[str, List[str]] = {}
+    for part in parts:
+        for key, value in part.get("structure", {}).items():
+            existing = structure.get(key)
+            if isinstance(existing, list) and isinstance(value, list):
+                existing.extend(value)
+            elif isinstance(existing, dict) and isinstance(value, dict):
+                for k, v in value.items():
+                    if not existing.get(k): existing[k] = v
+            elif not existing:
+                structure[key] = value
+        for category, names in part.get("skills", {}).items():
+            merged = skills.setdefault(category, [])
+            merged.extend(name for name in names if name not in merged)
+    return {"structure": structure, "skills": skills}
+
+# Results derived from a resume, keyed by its fingerprint: re-uploads of the same text (e.g. a re-exported PDF)
+# skip the AI calls entirely
+_RESUME_RESULTS_CACHE = LRUCache(max_size=256, ttl=24 * 3600)
+
+def resume_fingerprint(resume_text: str) -> str:
+    """sha256 of the lowercased, whitespace-collapsed resume text. Compute once per upload and pass it along."""
+    return hashlib.sha256(" ".join(resume_text.lower().split()).encode("utf-8")).hexdigest()
+
+def _resume_results_get(kind: str, fingerprint: str, *extra: str) -> Optional[Any]:
+    cached = _RESUME_RESULTS_CACHE.get((kind, fingerprint, *extra))
+    # Callers mutate the returned dicts (raw_text, metadata...), so never hand out the cached object itself
+    return copy.deepcopy(cached) if cached is not None else None
+
+def _resume_results_set(kind: str, fingerprint: str, value: Any, *extra: str) -> None:
+    _RESUME_RESULTS_CACHE.set((kind, fingerprint, *extra), copy.deepcopy(value))
+
+def extract_resume_structure_and_skills(resume_text: str, fingerprint: Optional[str] = None) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, List[str]]]]:
+    """
+    Structures the resume and categorizes its skills in a single Gemini call, so the resume text
+    is sent (and billed) once. Returns (structure, skills); either may be None on failure.
+    Blocking, like get_resume_structure and categorize_skills_from_text built on it: from async code
+    await `parse_resume_bundle` instead, or run this via asyncio.to_thread.
+    """
+    fingerprint = fingerprint or resume_fingerprint(resume_text)
+    cached = _resume_results_get("bundle", fingerprint)
+    if cached is not None:
+        return cached
+    chunks = _chunk_resume_text(resume_text)
+    parts = [_validated_call(_resume_bundle_prompt(chunk), RESUME_BUNDLE_ADAPTER, system_instruction=_RESUME_BUNDLE_INSTRUCTIONS, cache=True) for chunk in chunks]
+    result = _split_resume_bundle(parts[0] if len(parts) == 1 else _merge_resume_bundles(parts))
+    if result[0] is not None:
+        _resume_results_set("bundle", fingerprint, result)
+    return result
+
+def get_resume_structure(resume_text: str, fingerprint: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    return extract_resume_structure_and_skills(resume_text, fingerprint)[0]
+
+def categorize_skills_from_text(resume_text: str, fingerprint: Optional[str] = None) -> Optional[Dict[str, List[str]]]:
+    return extract_resume_structure_and_skills(resume_text, fingerprint)[1]
+
+async def parse_resume_bundle(resume_text: str, fingerprint: Optional[str] = None) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, List[str]]]]:
+    """
+    Async entry point for `extract_resume_structure_and_skills`, submitted through the shared Gemini dispatcher.
+    Oversized resumes are chunked and the chunks structured in parallel.
+    """
+    fingerprint = fingerprint or resume_fingerprint(resume_text)
+    cached = _resume_results_get("bundle", fingerprint)
+    if cached is not None:
+        print("DEBUG: Resume text already structured; reusing cached structure and skills.")
+        return cached
+    chunks = _chunk_resume_text(resume_text)
+    if len(chunks) > 1:
+        print(f"DEBUG: Resume is ~{_estimate_tokens(resume_text)} tokens; structuring it in {len(chunks)} chunks.")
+    parts = await asyncio.gather(*[
+        _validated_call_async(_resume_bundle_prompt(chunk), RESUME_BUNDLE_ADAPTER, system_instruction=_RESUME_BUNDLE_INSTRUCTIONS, cache=True)
+        for chunk in chunks
+    ])
+    result = _split_resume_bundle(parts[0] if len(parts) == 1 else _merge_resume_bundles(parts))
+    if result[0] is not None:
+        _resume_results_set("bundle", fingerprint, result)
+    return result
+
+
+# Static preamble of the resume optimizer prompt, sent as the system instruction (see _call_gemini_with_fallback)
+_RESUME_OPTIMIZER_SYSTEM = """
 CONTEXT: You are an elite career strategist and executive resume writer. Your task is to transform a resume from a passive list of duties into a compelling narrative of achievements that will impress top-tier recruiters.
 **Your Transformation Checklist (Apply to every relevant bullet point):**
 1.  **Lead with a Powerful Action Verb:** Replace weak verbs with strong, specific verbs (e.g., "Engineered," "Architected," "Spearheaded").
@@ -330,8 +565,6 @@ CONTEXT: You are an elite career strategist and executive resume writer. Your ta
 4.  **Integrate Technical Skills Naturally:** Weave technologies into the story of the achievement.
 5.  **Ensure Brevity and Clarity:** Remove filler words. Each bullet point should be a single, powerful line.
 
-{job_desc_context} 
-
 **Critical Rules:**
 - **Do not modify, add, or delete any titles, names, companies, institutions, or skill names.** This is a strict rule. Only rewrite descriptions.
 - DO NOT invent facts or skills.
@@ -340,84 +573,128 @@ CONTEXT: You are an elite career strategist and executive resume writer. Your ta
 - Do not modify personal information (name, email, phone).
 - Your final output must be only the requested, valid JSON. Do not include markdown.
 """
-    if section_req:
-        mapped = _best_section_key(section_req, keys_present)
-        if not mapped: return resume_json
-        sec_data = resume_json.get(mapped)
-        prompt = f"""
-{base_prompt_context}
-TASK: Apply your full transformation checklist to optimize ONLY the following JSON section, named "{mapped}".
+
+# Sections that are never sent for rewriting when the whole resume is optimized
+_OPTIMIZE_SKIP_KEYS = frozenset({'personal_info', 'skills', 'resume_metadata', 'raw_text', 'optimized_summary'})
+
+def _optimizer_section_prompt(name: str, sec_data: Any, job_desc_context: str) -> str:
+    return f"""
+{job_desc_context}
+TASK: Apply your full transformation checklist to optimize ONLY the following JSON section, named "{name}".
 --- INPUT JSON SECTION ---
-{json.dumps(sec_data, indent=2)}
---- END INPUT JSON ---
-"""
-    else:
-        prompt = f"""
-{base_prompt_context}
-TASK: Apply your full transformation checklist to optimize all sections of the following resume JSON.
---- FULL INPUT JSON ---
-{json.dumps(resume_json, indent=2)}
+{_compact_json(sec_data)}
 --- END INPUT JSON ---
 """
-    response = _call_gemini_with_fallback(prompt)
-    if not response: return resume_json
-        
+
+async def _optimize_section(name: str, sec_data: Any, job_desc_context: str) -> Optional[Any]:
+    """Rewrites one resume section; returns None if the call or the JSON parse fails."""
+    response = await gemini_dispatcher.submit(_optimizer_section_prompt(name, sec_data, job_desc_context), system_instruction=_RESUME_OPTIMIZER_SYSTEM)
+    if not response: return None
     optimized_data = _safe_json_loads(response.text, fallback=None)
+    # The model sometimes echoes the section name as a wrapper object
+    if isinstance(optimized_data, dict) and len(optimized_data) == 1 and name in optimized_data:
+        optimized_data = optimized_data[name]
     if not optimized_data:
-        print("\n--- ERROR: GEMINI API FAILED TO RETURN VALID JSON (OPTIMIZE) ---")
-        return resume_json
-            
-    if section_req and optimized_data:
-        resume_json[mapped] = optimized_data
-    elif optimized_data:
-        for key, value in optimized_data.items():
-            if key in resume_json: resume_json[key] = value
+        print(f"\n--- ERROR: GEMINI API FAILED TO RETURN VALID JSON (OPTIMIZE '{name}') ---")
+        return None
+    return optimized_data
+
+async def optimize_resume_json(resume_json: Dict[str, Any], user_input: str, job_description: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Rewrites resume descriptions. A "section: instruction" request optimizes that one section; otherwise every
+    transformable section is optimized in its own concurrent call, so total latency is that of the slowest
+    section and a failed section simply keeps its original content.
+    """
+    section_req, instruction = parse_user_optimization_input(user_input)
+    keys_present = list(resume_json.keys())
+    
+    job_desc_context = ""
+    if job_description and job_description.strip():
+        job_desc_context = f"""
+        **Job Description Context:**
+        Below is the job description for which the resume is being optimized. Incorporate keywords, desired skills, and align the achievements to the requirements of this role.
+        ```
+        {job_description}
+        ```
+        """
+    if section_req:
+        mapped = _best_section_key(section_req, keys_present)
+        if not mapped: return resume_json
+        sections = [mapped]
+    else:
+        sections = [k for k, v in resume_json.items() if k not in _OPTIMIZE_SKIP_KEYS and v]
+
+    results = await asyncio.gather(
+        *[_optimize_section(name, resume_json[name], job_desc_context) for name in sections],
+        return_exceptions=True,
+    )
+    for name, optimized_data in zip(sections, results):
+        if isinstance(optimized_data, Exception):
+            print(f"⚠️ Optimizing section '{name}' failed: {optimized_data}. Keeping original.")
+        elif optimized_data:
+            resume_json[name] = optimized_data
 
     return resume_json
 
 
-def optimize_for_linkedin(resume_json: Dict[str, Any], user_input: str, job_description: Optional[str] = None) -> Optional[Dict[str, Any]]:
+def _join_description(description: Any) -> str:
+    return ' '.join(description) if isinstance(description, list) else str(description)
+
+# Resume sections that are handled explicitly above (or never sent to LinkedIn)
+_LINKEDIN_SKIP_KEYS = frozenset({'personal_info', 'summary', 'work_experience', 'internships', 'projects', 'skills', 'education', 'certifications', 'resume_metadata', 'raw_text'})
+# Formatters for the remaining free-form sections, dispatched on the value's type; other types are skipped
+_LINKEDIN_SECTION_FORMATTERS = {
+    str: lambda title, value: f"\n{title}:\n{value}",
+    list: lambda title, value: f"\n{title}:\n" + "\n".join(map(str, value)),
+}
+
+def _build_linkedin_context(resume_json: Dict[str, Any]) -> str:
+    """Flattens the resume JSON into the plain-text context used by the LinkedIn prompt."""
     context_text = []
     if 'summary' in resume_json: context_text.append(f"Summary:\n{resume_json['summary']}")
     
     all_experiences = resume_json.get('work_experience', []) + resume_json.get('internships', [])
     if all_experiences:
         context_text.append("\nProfessional Experience & Internships:")
-        for job in all_experiences:
-            description_str = ' '.join(job.get('description', []) if isinstance(job.get('description'), list) else [str(job.get('description', ''))])
-            context_text.append(f"- {job.get('role')} at {job.get('company')}: {description_str}")
+        context_text.extend(f"- {job.get('role')} at {job.get('company')}: {_join_description(job.get('description', ''))}" for job in all_experiences)
     
     if 'projects' in resume_json:
         context_text.append("\nProjects:")
-        for project in resume_json['projects']:
-            description_str = ' '.join(project.get('description', []) if isinstance(project.get('description'), list) else [str(project.get('description', ''))])
-            context_text.append(f"- {project.get('title')}: {description_str}")
+        context_text.extend(f"- {project.get('title')}: {_join_description(project.get('description', ''))}" for project in resume_json['projects'])
     
     if 'skills' in resume_json and isinstance(resume_json['skills'], dict):
         skills_summary = ", ".join([f"{cat}: {', '.join(skills)}" for cat, skills in resume_json['skills'].items()])
         context_text.append(f"\nSkills: {skills_summary}")
     
     for key, value in resume_json.items():
-        if key not in ['personal_info', 'summary', 'work_experience', 'internships', 'projects', 'skills', 'education', 'certifications', 'resume_metadata', 'raw_text']:
-            if isinstance(value, str):
-                context_text.append(f"\n{key.replace('_', ' ').title()}:\n{value}")
-            elif isinstance(value, list):
-                context_text.append(f"\n{key.replace('_', ' ').title()}:\n" + "\n".join([str(item) for item in value]))
+        if key in _LINKEDIN_SKIP_KEYS: continue
+        formatter = _LINKEDIN_SECTION_FORMATTERS.get(type(value))
+        if formatter: context_text.append(formatter(key.replace('_', ' ').title(), value))
 
-    resume_context = "\n".join(context_text)
-    section_req, instruction = parse_user_optimization_input(user_input)
+    return "\n".join(context_text)
 
-    job_desc_context = ""
-    if job_description and job_description.strip():
-        job_desc_context = f"""
-        **Job Description Context:**
-        Below is the job description for which the LinkedIn profile is being optimized. Align the content with the keywords, requirements, and tone of this role.
-        ```
-        {job_description}
-        ```
-        """
-    
-    base_prompt_context = f"""
+# LinkedIn context per resume content; users iterate over headline/about/experience variants of the same resume
+_LINKEDIN_CONTEXT_CACHE = LRUCache(max_size=256, ttl=3600)
+# Fields that never reach the context (and may carry per-request timestamps), so they are left out of the hash
+_LINKEDIN_HASH_EXCLUDED_KEYS = ('resume_metadata', 'raw_text')
+
+def _linkedin_context(resume_json: Dict[str, Any], fingerprint: Optional[str] = None) -> str:
+    if fingerprint:
+        key = fingerprint
+    else:
+        frozen_json = orjson.dumps(
+            {k: v for k, v in resume_json.items() if k not in _LINKEDIN_HASH_EXCLUDED_KEYS},
+            default=str, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS,
+        )
+        key = hashlib.sha256(frozen_json).hexdigest()
+    resume_context = _LINKEDIN_CONTEXT_CACHE.get(key)
+    if resume_context is None:
+        resume_context = _build_linkedin_context(resume_json)
+        _LINKEDIN_CONTEXT_CACHE.set(key, resume_context)
+    return resume_context
+
+# Static preamble of the LinkedIn prompt, sent as the system instruction
+_LINKEDIN_SYSTEM = """
 You are an expert LinkedIn profile strategist and personal branding coach.
 Your task is to generate compelling, optimized text for a user's LinkedIn profile based on the provided resume content.
 **Instructions:**
@@ -426,24 +703,39 @@ Your task is to generate compelling, optimized text for a user's LinkedIn profil
 3.  **Experiences:** For EACH job/internship in the context, rewrite the bullet points to be concise and results-oriented.
 4.  **Projects:** For EACH project in the context, rewrite its description to be engaging for a LinkedIn audience.
 
-{job_desc_context}
 **JSON Output Schema:**
-{{
+{
     "headlines": ["string option 1", ...],
     "about_section": "string",
-    "optimized_experiences": [ {{ "title": "Role at Company", "description": "string" }} ],
-    "optimized_projects": [ {{ "title": "Project Title", "description": "string" }} ]
-}}
+    "optimized_experiences": [ { "title": "Role at Company", "description": "string" } ],
+    "optimized_projects": [ { "title": "Project Title", "description": "string" } ]
+}
 
 **Critical Rules:**
 - Generate content ONLY from the provided resume context.
 - Keep the tone professional but approachable.
 - Your final output must be ONLY the valid JSON object that matches the requested task.
 """
+
+async def optimize_for_linkedin(resume_json: Dict[str, Any], user_input: str, job_description: Optional[str] = None, fingerprint: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    # Only pass `fingerprint` when resume_json is the untouched structure of that resume text
+    resume_context = _linkedin_context(resume_json, fingerprint)
+    section_req, instruction = parse_user_optimization_input(user_input)
+
+    job_desc_context = ""
+    if job_description and job_description.strip():
+        job_desc_context = f"""
+        **Job Description Context:**
+        Below is the job description for which the LinkedIn profile is being optimized. Align the content with the keywords, requirements, and tone of this role.
+        ```
+        {job_description}
+        ```
+        """
+    
     if section_req:
         instr_text = instruction or f"Make the {section_req} section more compelling and professional."
         prompt = f"""
-{base_prompt_context}
+{job_desc_context}
 TASK: Based on the resume context, optimize ONLY the '{section_req}' portion of a LinkedIn profile.
 --- RESUME CONTEXT ---
 {resume_context}
@@ -452,16 +744,14 @@ TASK: Based on the resume context, optimize ONLY the '{section_req}' portion of
     else:
         instr_text = instruction or "Optimize the entire LinkedIn profile, processing every experience and project."
         prompt = f"""
-{base_prompt_context}
+{job_desc_context}
 TASK: Based on the resume context, perform a full optimization of a LinkedIn profile.
 --- RESUME CONTEXT ---
 {resume_context}
 --- END RESUME CONTEXT ---
 """
 
-    response = _call_gemini_with_fallback(prompt)
-    if not response: return None
-    data = _safe_json_loads(response.text, fallback=None)
+    data = await _validated_call_async(prompt, LINKEDIN_CONTENT_ADAPTER, system_instruction=_LINKEDIN_SYSTEM)
     if not data:
         print("\n--- ERROR: GEMINI FAILED TO INFER LINKEDIN CONTENT ---")
         return None
@@ -471,10 +761,10 @@ TASK: Based on the resume context, perform a full optimization of a LinkedIn pro
 def _strip_markdown(text: str) -> str:
     """Removes markdown characters like ** and * from a string."""
     # This function is correct and does not interfere with numbered lists.
-    return re.sub(r'[\*_`]', '', text)
+    return text.translate(_MARKDOWN_STRIP_TABLE) if text else text
 
 
-def get_tutor_explanation(topic: str) -> Optional[Dict[str, Any]]:
+async def get_tutor_explanation(topic: str) -> Optional[Dict[str, Any]]:
     """
     Generates a simple explanation for a technical topic.
     **IMPROVEMENT**: The prompt is now radically simplified to fix the "NA" issue.
@@ -493,17 +783,13 @@ def get_tutor_explanation(topic: str) -> Optional[Dict[str, Any]]:
     3.  "code_example": A JSON object containing "language" (e.g., "javascript") and "code" (a short, well-commented code snippet). If no code is relevant, the "code" value should be an empty string.
     4.  "prerequisites": An array of 1-3 prerequisite concepts the user might need to know.
     """
-    response = _call_gemini_with_fallback(prompt)
-    if not response: return None
-    cleaned_response_text = response.text.replace('```json', '').replace('```', '').strip()
-    try:
-        return json.loads(cleaned_response_text)
-    except Exception as e:
-        print(f"An error occurred in AI Tutor: {e}"); return None
+    data = await _validated_call_async(prompt, TUTOR_EXPLANATION_ADAPTER)
+    if data is None: print("An error occurred in AI Tutor: no valid explanation was returned")
+    return data
 
 
 
-def generate_career_roadmap(user_profile: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+async def generate_career_roadmap(user_profile: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     # This function is working correctly from the previous update.
     prompt = f"""
     Act as a world-class AI Career Strategist. Your task is to generate a personalized career action plan as a single, valid JSON object.
@@ -530,13 +816,12 @@ def generate_career_roadmap(user_profile: Dict[str, Any]) -> Optional[Dict[str,
     8.  "suggested_courses": [{{ "course_name": "MERN Stack Front To Back", "platform": "Udemy", "url": "https://www.udemy.com/course/mern-stack-front-to-back/", "mapping": "Covers foundational and advanced MERN stack skills for your entire roadmap. This certificate covers the foundational skills in Phase 1 and 2." }}]
 
     """
-    response = _call_gemini_with_fallback(prompt)
-    if not response: return None
-    cleaned_response_text = response.text.replace('```json', '').replace('```', '').strip()
-    try:
-        return json.loads(cleaned_response_text)
-    except Exception as e:
-        print(f"An error occurred during AI roadmap generation: {e}"); return None
+    data = await _validated_call_async(prompt, CAREER_ROADMAP_ADAPTER, stream=True)
+    if data is None: print("An error occurred during AI roadmap generation: no valid roadmap was returned")
+    return data
+
+# Frontend chat roles -> Gemini roles; anything that isn't the user is the model
+_CHAT_ROLE_MAP = {'user': 'user'}
 
 def get_chatbot_response(query: str, history: list, career_plan_summary: str) -> dict:
     """
@@ -562,22 +847,27 @@ def get_chatbot_response(query: str, history: list, career_plan_summary: str) ->
         f"- Keep all points brief and easy to understand.\n"
     )
 
-    model_history = []
-    for message in history:
-        role = 'user' if message.get('role') == 'user' else 'model'
-        content = message.get('content', '')
-        if content: model_history.append({'role': role, 'parts': [content]})
+    model_history = [
+        {'role': _CHAT_ROLE_MAP.get(message.get('role'), 'model'), 'parts': [content]}
+        for message in history if (content := message.get('content'))
+    ]
 
     full_prompt = f"{system_prompt}\n\nUSER QUESTION: {query}"
     response = _call_gemini_with_fallback(prompt=full_prompt, is_chat=True, history=model_history)
 
-    if not response or not response.text:
+    text = _response_text(response)
+    if not text:
         raise Exception("AI response failed after trying all API keys.")
 
-    final_response = _strip_markdown(response.text)
+    final_response = _strip_markdown(text)
     return {"response": final_response}
 
-def generate_assessment_questions(assessment_type: str, skills: List[str], target_role: Optional[str] = None, num_questions: int = 5, user_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+# The last generated assessment per user, so submitted answers can be graded against the actual questions
+_ASSESSMENT_QUESTIONS_CACHE = LRUCache(max_size=1000, ttl=6 * 3600)
+ASSESSMENT_GRADING_CONCURRENCY = 8
+_CHOICE_QUESTION_TYPES = frozenset({"single_choice", "multiple_choice"})
+
+async def generate_assessment_questions(assessment_type: str, skills: List[str], target_role: Optional[str] = None, num_questions: int = 5, user_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
     """
     Generates a set of assessment questions based on selected skills and target role.
     Uses Gemini 2.5 Flash.
@@ -618,31 +908,109 @@ def generate_assessment_questions(assessment_type: str, skills: List[str], targe
     - Ensure `correct_answer_keys` is always a LIST, even if only one answer.
     """
 
-    response = _call_gemini_with_fallback(prompt)
-    if not response: return None
-    questions = _safe_json_loads(response.text, fallback=None)
-    if not questions or not isinstance(questions, list):
+    questions = await _validated_call_async(prompt, ASSESSMENT_QUESTIONS_ADAPTER)
+    if not questions:
         print("\n--- ERROR: GEMINI FAILED TO GENERATE VALID ASSESSMENT QUESTIONS ---")
         return None
+    if user_id:
+        _ASSESSMENT_QUESTIONS_CACHE.set(user_id, {q["question_id"]: q for q in questions})
     return {"questions": questions}
 
-def evaluate_assessment_answers(user_id: str, submitted_answers: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+def _answer_to_str(user_response: Any) -> str:
+    if isinstance(user_response, list):
+        return ", ".join(user_response)
+    elif user_response is None:
+        return "No answer provided"
+    return str(user_response)
+
+def _grade_choice_answer(question: Dict[str, Any], user_response: Any) -> Optional[Dict[str, Any]]:
+    """Grades single/multiple choice answers locally against `correct_answer_keys`; None if not applicable."""
+    correct = {str(k).strip().lower() for k in question.get("correct_answer_keys") or []}
+    if question.get("question_type") not in _CHOICE_QUESTION_TYPES or not correct:
+        return None
+    given_list = user_response if isinstance(user_response, list) else ([] if user_response is None else [user_response])
+    given = {str(k).strip().lower() for k in given_list}
+    hits, wrong = len(given & correct), len(given - correct)
+    score = round(100 * max(0, hits - wrong) / len(correct))
+    rationale = "Correct." if given == correct else f"Expected: {', '.join(question['correct_answer_keys'])}."
+    return {"score": score, "rationale": rationale}
+
+async def _grade_one(question: Dict[str, Any], user_response: Any, semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+    """Grades a single answer: choice questions locally, open-ended ones with a small Gemini call."""
+    result = _grade_choice_answer(question, user_response)
+    if result is None:
+        prompt = f"""
+    You are an expert technical interviewer grading one answer from a skill assessment.
+    Score the answer from 0 to 100 for correctness and completeness, and explain the score in one or two sentences.
+
+    **Question ({question.get('question_type', 'short_answer')}):** {question.get('question_text', '')}
+    **User Answer:** ```{_answer_to_str(user_response)}```
+
+    Respond with ONLY a JSON object: {{ "score": 0-100, "rationale": "string" }}
+    """
+        async with semaphore:
+            result = await _validated_call_async(prompt, GRADED_ANSWER_ADAPTER)
+        if result is None:
+            result = {"score": None, "rationale": "Could not be graded automatically."}
+    return {"question_id": question.get("question_id"), "question_text": question.get("question_text", ""), "answer": _answer_to_str(user_response), **result}
+
+async def evaluate_assessment_answers(user_id: str, submitted_answers: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
     """
     Evaluates user's assessment answers using Gemini 2.5 Flash and provides structured results.
+    When the generated questions are known, each answer is graded on its own (concurrently, choice questions
+    without an AI call) and a short aggregation call turns the per-question grades into the report.
     """
+    questions_by_id = _ASSESSMENT_QUESTIONS_CACHE.get(user_id) if user_id else None
+    if not questions_by_id or any(ans.get("question_id") not in questions_by_id for ans in submitted_answers):
+        # Questions unknown (e.g. generated by another worker): grade everything in one call
+        return await asyncio.to_thread(_evaluate_answers_in_one_call, submitted_answers)
+
+    semaphore = asyncio.Semaphore(ASSESSMENT_GRADING_CONCURRENCY)
+    graded = await asyncio.gather(*[
+        _grade_one(questions_by_id[ans["question_id"]], ans.get("answer"), semaphore) for ans in submitted_answers
+    ])
+    scores = [g["score"] for g in graded if g["score"] is not None]
+
+    graded_text = "\n".join(
+        f"Question: {g['question_text']}\nUser Answer: ```{g['answer']}```\nScore: {g['score'] if g['score'] is not None else 'ungraded'}\nGrader Notes: {g['rationale']}\n---"
+        for g in graded
+    )
+    prompt = f"""
+    You are an expert technical interviewer and AI grader.
+    Each answer of a skill assessment has already been graded individually (below). Summarize them into a
+    structured evaluation. Do not re-grade the answers.
 
+    **Instructions for Evaluation:**
+    1.  **Identify Skills Mastered/Areas to Improve (Counts):** Estimate how many distinct skills were demonstrated proficiently and how many need significant improvement.
+    2.  **List Strengths:** Provide 2-3 specific bullet points highlighting what the user did well.
+    3.  **List Weaknesses:** Provide 2-3 specific bullet points highlighting areas where the user struggled or demonstrated gaps.
+    4.  **Personalized Recommendations:** Provide 2-3 actionable, general recommendations for improvement. These should be text-based recommendations, not URLs.
+
+    **Graded Answers:**
+    {graded_text}
+
+    **JSON Output Schema:**
+{ASSESSMENT_EVALUATION_SCHEMA.strip()}
+    **Critical Rules:**
+    - Your final output MUST be a single, valid JSON object following the schema.
+    - DO NOT include any introductory or concluding text outside the JSON.
+    - The `skill_scores` should be an object mapping skill names (e.g., Python, SQL) to a proficiency score (0-100). Infer these skills from the questions.
+    """
+    response = await gemini_dispatcher.submit(prompt)
+    results = _safe_json_loads(response.text, fallback=None) if response else None
+    if not results or not isinstance(results, dict):
+        print("\n--- ERROR: GEMINI FAILED TO EVALUATE ASSESSMENT ANSWERS ---")
+        return None
+    # The overall score comes from the individual grades rather than the summarizer's estimate
+    if scores:
+        results["overall_score"] = round(sum(scores) / len(scores))
+    return results
+
+def _evaluate_answers_in_one_call(submitted_answers: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
     answers_summary = []
     for ans in submitted_answers:
         q_id = ans.get("question_id", "N/A")
-        user_response = ans.get("answer")
-        
-        if isinstance(user_response, list):
-            user_response_str = ", ".join(user_response)
-        elif user_response is None:
-            user_response_str = "No answer provided"
-        else:
-            user_response_str = str(user_response)
-        
+        user_response_str = _answer_to_str(ans.get("answer"))
         answers_summary.append(f"Question ID: {q_id}\nUser Answer: ```{user_response_str}```\n---")
 
     answers_text = "\n".join(answers_summary)
@@ -679,13 +1047,84 @@ def evaluate_assessment_answers(user_id: str, submitted_answers: List[Dict[str,
         return None
     return results
 
-def generate_full_resume_analysis(resume_text: str, job_description: Optional[str] = None) -> Optional[Dict[str, Any]]:
+# Static preamble of the full analysis prompt, sent as the system instruction (the schema is interpolated once, at import)
+_FULL_RESUME_ANALYSIS_SYSTEM = f"""
+    You are an expert HR consultant and AI resume analyst. Your task is to provide a comprehensive analysis of the given resume.
+    Generate a detailed report covering overall assessment, specific section analyses, key strengths, areas for improvement,
+    and a dedicated ATS optimization score, all in a single JSON object.
+
+    **Instructions:**
+    1.  **Analysis Date:** Current date (e.g., "September 05, 2025").
+    2.  **Job Role Context:** Infer a primary job role from the provided job description (if any) or from the resume itself. Default to "General Candidate" if unclear.
+    3.  **AI Model:** "Google Gemini"
+    4.  **Overall Resume Score:** A percentage (0-100) reflecting general quality, clarity, and effectiveness.
+    5.  **Overall Resume Grade:** A concise word (e.g., "Excellent", "Good", "Fair", "Needs Improvement") corresponding to the score.
+    6.  **ATS Optimization Score:** A percentage (0-100) reflecting compatibility with Applicant Tracking Systems, especially considering the job description.
+    7.  **Section-wise Analysis:** Provide a 'title' and 'summary' for:
+        -   `professional_profile_analysis`: For the summary/objective section.
+        -   `education_analysis`: For the education section.
+        -   `experience_analysis`: For work experience and projects.
+        -   `skills_analysis`: For the skills section.
+    8.  **Key Strengths:** 2-3 bullet points highlighting positive aspects.
+    9.  **Areas for Improvement:** 3-5 bullet points covering general resume improvements AND specific ATS issues (e.g., keyword gaps, formatting problems).
+    10. **Overall Assessment:** A concluding paragraph summarizing the findings and potential for improvement.
+
+    **JSON Output Schema:**
+{FULL_RESUME_ANALYSIS_SCHEMA.strip()}
+    **Critical Rules:**
+    - Your final output MUST be a single, valid JSON object following the schema.
+    - DO NOT include any introductory or concluding text outside the JSON.
+    - Ensure all scores are integers (0-100).
+    - If no job description is provided, make reasonable general assumptions for the 'Job Role Context' and ATS analysis.
+    - For `analysis_date`, always use the current date in 'Month DD, YYYY' format.
+    - For section summaries, be direct and actionable, similar to the provided examples.
+    """
+
+# Inferred job roles keyed by a hash of the job description; users re-run the analysis against the same JD
+_ROLE_CACHE = LRUCache(max_size=256, ttl=24 * 3600)
+# Role inferences still running after their analysis returned (strong refs so they finish and fill the cache)
+_ROLE_TASKS: Set[asyncio.Task] = set()
+
+def _role_cache_key(job_description: str) -> str:
+    return hashlib.sha256(job_description.strip().encode("utf-8")).hexdigest()
+
+async def _infer_and_cache_role(job_description: str) -> Optional[str]:
+    """Infers the primary job role from a JD and stores it in _ROLE_CACHE. Returns None if it can't."""
+    # A simple AI call to infer job role, now using the fallback mechanism.
+    role_prompt = f"Extract the primary job role from the following job description. Respond with only the job role text (e.g., 'Software Engineer', 'Data Scientist', 'Frontend Developer').\n\nJob Description: {job_description}"
+    role_response = await gemini_dispatcher.submit(role_prompt)
+    role_text = _response_text(role_response)
+    if role_text:
+        inferred_role = role_text.strip()
+        if inferred_role and len(inferred_role.split()) < 5:  # Basic check for validity
+            _ROLE_CACHE.set(_role_cache_key(job_description), inferred_role)
+            return inferred_role
+    print(f"Warning: Could not infer job role from JD. Using default.")
+    return None
+
+def _finish_role_task(task: asyncio.Task) -> None:
+    _ROLE_TASKS.discard(task)
+    if not task.cancelled() and task.exception():
+        print(f"Warning: Background job role inference failed: {task.exception()}")
+
+async def generate_full_resume_analysis(resume_text: str, job_description: Optional[str] = None, fingerprint: Optional[str] = None) -> Optional[Dict[str, Any]]:
     """
     Generates a comprehensive resume analysis report, including overall score,
     ATS score, strengths, areas for improvement, and section-wise feedback.
+    The job role is taken from _ROLE_CACHE when known; otherwise it is inferred in a background task
+    alongside the main call and only applied if it is ready when the analysis comes back.
+    Reports are cached per (resume fingerprint, job description).
     """
+    fingerprint = fingerprint or resume_fingerprint(resume_text)
+    jd_key = _role_cache_key(job_description) if job_description and job_description.strip() else ""
+    cached_report = _resume_results_get("analysis", fingerprint, jd_key)
+    if cached_report is not None:
+        cached_report['analysis_date'] = datetime.now().strftime("%B %d, %Y")
+        return cached_report
+
     job_desc_context = ""
     job_role_hint = "General Candidate"  # Default value
+    role_task: Optional[asyncio.Task] = None
 
     # --- MODIFIED SECTION ---
     # This block now uses the robust fallback function to get the job role.
@@ -700,79 +1139,44 @@ def generate_full_resume_analysis(resume_text: str, job_description: Optional[st
     {job_description}
     ```
     """
-        # A simple AI call to infer job role, now using the fallback mechanism.
-        role_prompt = f"Extract the primary job role from the following job description. Respond with only the job role text (e.g., 'Software Engineer', 'Data Scientist', 'Frontend Developer').\n\nJob Description: {job_description}"
-        
-        role_response = _call_gemini_with_fallback(role_prompt) # Using the new fallback function here.
-        
-        if role_response and role_response.text:
-            inferred_role = role_response.text.strip()
-            if inferred_role and len(inferred_role.split()) < 5:  # Basic check for validity
-                job_role_hint = inferred_role
+        # The role only feeds job_role_context, which is patched in after the main call, so it never blocks it.
+        cached_role = _ROLE_CACHE.get(_role_cache_key(job_description))
+        if cached_role:
+            job_role_hint = cached_role
         else:
-             print(f"Warning: Could not infer job role from JD. Using default.")
+            role_task = asyncio.create_task(_infer_and_cache_role(job_description))
     # --- END MODIFIED SECTION ---
 
 
-    # This is your original main prompt, it remains unchanged.
+    # Original main prompt, split so the static instructions go in the system instruction and only the JD and resume vary.
     prompt = f"""
-    You are an expert HR consultant and AI resume analyst. Your task is to provide a comprehensive analysis of the given resume.
-    Generate a detailed report covering overall assessment, specific section analyses, key strengths, areas for improvement,
-    and a dedicated ATS optimization score, all in a single JSON object.
-
-    **Instructions:**
-    1.  **Analysis Date:** Current date (e.g., "September 05, 2025").
-    2.  **Job Role Context:** Infer a primary job role from the provided job description (if any) or from the resume itself. Default to "General Candidate" if unclear.
-    3.  **AI Model:** "Google Gemini"
-    4.  **Overall Resume Score:** A percentage (0-100) reflecting general quality, clarity, and effectiveness.
-    5.  **Overall Resume Grade:** A concise word (e.g., "Excellent", "Good", "Fair", "Needs Improvement") corresponding to the score.
-    6.  **ATS Optimization Score:** A percentage (0-100) reflecting compatibility with Applicant Tracking Systems, especially considering the job description.
-    7.  **Section-wise Analysis:** Provide a 'title' and 'summary' for:
-        -   `professional_profile_analysis`: For the summary/objective section.
-        -   `education_analysis`: For the education section.
-        -   `experience_analysis`: For work experience and projects.
-        -   `skills_analysis`: For the skills section.
-    8.  **Key Strengths:** 2-3 bullet points highlighting positive aspects.
-    9.  **Areas for Improvement:** 3-5 bullet points covering general resume improvements AND specific ATS issues (e.g., keyword gaps, formatting problems).
-    10. **Overall Assessment:** A concluding paragraph summarizing the findings and potential for improvement.
-
     {job_desc_context}
 
     **Resume Text:**
     ```
     {resume_text}
     ```
-
-    **JSON Output Schema:**
-{FULL_RESUME_ANALYSIS_SCHEMA.strip()}
-    **Critical Rules:**
-    - Your final output MUST be a single, valid JSON object following the schema.
-    - DO NOT include any introductory or concluding text outside the JSON.
-    - Ensure all scores are integers (0-100).
-    - If no job description is provided, make reasonable general assumptions for the 'Job Role Context' and ATS analysis.
-    - For `analysis_date`, always use the current date in 'Month DD, YYYY' format.
-    - For section summaries, be direct and actionable, similar to the provided examples.
     """
     
     # --- MODIFIED SECTION ---
     # The main API call for the analysis also uses the fallback function now.
-    response = _call_gemini_with_fallback(prompt)
-    if not response:
-        return None # Return None if all API keys fail.
-    
-    analysis_data = _safe_json_loads(response.text, fallback=None)
-    
-    if not analysis_data or not isinstance(analysis_data, dict):
+    analysis_data = await _validated_call_async(prompt, FULL_RESUME_ANALYSIS_ADAPTER, stream=True, system_instruction=_FULL_RESUME_ANALYSIS_SYSTEM)
+    if role_task is not None:
+        if role_task.done():
+            if not role_task.cancelled() and not role_task.exception():
+                job_role_hint = role_task.result() or job_role_hint
+        else:
+            # Not ready yet: don't wait for it, let it finish in the background and populate the cache
+            _ROLE_TASKS.add(role_task)
+            role_task.add_done_callback(_finish_role_task)
+    if not analysis_data:
         print("\n--- ERROR: GEMINI FAILED TO GENERATE VALID FULL RESUME ANALYSIS ---")
-        print("API Response Text:", response.text)
-        try: print("API Prompt Feedback:", response.prompt_feedback)
-        except ValueError: pass
-        print("------------------------------------------------------------------\n")
         return None
     
     # Override job_role_context with the one we inferred earlier.
     if job_role_hint != "General Candidate": 
         analysis_data['job_role_context'] = job_role_hint
+    _resume_results_set("analysis", fingerprint, analysis_data, jd_key)
     
     # Ensure analysis_date is always current, regardless of what the AI generates.
     analysis_data['analysis_date'] = datetime.now().strftime("%B %d, %Y")
@@ -780,37 +1184,36 @@ def generate_full_resume_analysis(resume_text: str, job_description: Optional[st
     return analysis_data
     # --- END MODIFIED SECTION ---
 
-def get_interview_chat_response(job_description: str, history: List[Dict[str, str]], difficulty: str) -> Optional[Dict[str, str]]:
-    """
-    Acts as an AI Interviewer with adjustable difficulty, now with API key fallback.
-    """
-    # This is your original logic to determine the AI's personality based on difficulty.
-    # It remains completely unchanged.
-    if difficulty == 'easy':
-        personality_prompt = """
+# Interviewer personas by difficulty (medium is the default)
+_PERSONA_PROMPTS: Dict[str, str] = {
+    'easy': """
         Your Persona: You are a friendly and encouraging hiring manager for an entry-level role.
         Your Goal: Understand the candidate's basic knowledge and potential. Ask foundational, single-topic conceptual questions (e.g., "In Python, what is the difference between a list and a tuple?").
         Your Tone: Supportive and patient.
         Your First Action: Start with a simple, welcoming question like "Thanks for coming in. To start, could you tell me about a project you're proud of that's relevant to this role?"
-        """
-    elif difficulty == 'hard':
-        personality_prompt = """
+        """,
+    'hard': """
         Your Persona: You are a sharp, direct senior engineer conducting a final-round interview.
         Your Goal: Rigorously test the candidate's deep technical expertise, problem-solving, and system design skills. Ask challenging, multi-part, or scenario-based questions (e.g., "Given the requirements in the job description, walk me through how you would design a scalable, resilient API for our service. What bottlenecks would you anticipate and how would you mitigate them?").
         Your Tone: Critical, professional, and expecting detailed answers. You will ask tough follow-up questions.
         Your First Action: Start directly with a challenging technical question based on a core skill from the job description.
-        """
-    else: # Default to Medium
-        personality_prompt = """
+        """,
+    'medium': """
         Your Persona: You are a professional team lead for a mid-level role.
         Your Goal: Evaluate the candidate's practical competence and fit for the team. Ask a mix of conceptual questions and practical scenarios (e.g., "How would you handle a merge conflict in Git?" or "Explain the concept of 'hoisting' in JavaScript.").
         Your Tone: Professional, direct, and balanced.
         Your First Action: Start with a standard technical screening question.
-        """
-    # This is your original logic for preparing the chat history.
-    # It also remains completely unchanged.
-    formatted_history = [{'role': msg['role'], 'parts': [{'text': msg['content']}]} for msg in history]
-    system_instruction = f"""
+        """,
+}
+
+_INTERVIEW_KICKOFF = "I am ready to begin the interview."
+
+# Every turn of a session asks for the same (JD, difficulty) instruction; memoizing returns the very same
+# string object, so the handler's model cache lookup doesn't re-hash the JD each turn either
+@lru_cache(maxsize=256)
+def _interview_system_instruction(job_description: str, difficulty: str) -> str:
+    personality_prompt = _PERSONA_PROMPTS.get(difficulty, _PERSONA_PROMPTS['medium'])
+    return f"""
     {personality_prompt}
     
     CRITICAL RULE: You are the INTERVIEWER. The user is the CANDIDATE. You must conduct a realistic interview.
@@ -820,41 +1223,64 @@ def get_interview_chat_response(job_description: str, history: List[Dict[str, st
     {job_description}
     --- END CONTEXT ---
     """
-    full_history = [
-        {'role': 'user', 'parts': [{'text': system_instruction}]},
-        {'role': 'model', 'parts': [{'text': "Understood. I am ready to begin the interview."}]}
-    ] + formatted_history
-    
-    # --- MODIFIED SECTION ---
-    # Instead of the try/except block, we now prepare the arguments for our new fallback function.
-    
-    # The 'prompt' is the newest message from the user.
-    last_user_message = full_history[-1]['parts'][0]['text']
-    
-    # The 'history' is everything that came before the user's newest message.
-    chat_history_for_api = full_history[:-1]
-    
-    # Call our resilient fallback function with the chat parameters.
+
+# The client resends the whole interview every turn; earlier turns are identical, so their SDK-shaped
+# dicts are reused instead of rebuilt (they are only read, never mutated, by the SDK and Groq fallback)
+@lru_cache(maxsize=2048)
+def _chat_turn(role: str, content: str) -> Dict[str, Any]:
+    return {'role': role, 'parts': [{'text': content}]}
+
+def get_interview_chat_response(job_description: str, history: List[Dict[str, str]], difficulty: str) -> Optional[Dict[str, str]]:
+    """
+    Acts as an AI Interviewer with adjustable difficulty, now with API key fallback.
+    The persona and job description are identical on every turn of a session, so they are sent as the
+    system instruction (a stable prefix Gemini can cache) instead of being replayed as a chat message.
+    """
+    formatted_history = [_chat_turn(msg['role'], msg['content']) for msg in history]
+    # Chats must open with a user turn: kick off a fresh interview, or lead in to the interviewer's first question
+    if not formatted_history or formatted_history[0]['role'] != 'user':
+        formatted_history.insert(0, {'role': 'user', 'parts': [{'text': _INTERVIEW_KICKOFF}]})
+
+    # The 'prompt' is the newest message from the user; the history is everything before it.
     response = _call_gemini_with_fallback(
-        prompt=last_user_message, 
-        is_chat=True, 
-        history=chat_history_for_api
+        prompt=formatted_history[-1]['parts'][0]['text'],
+        is_chat=True,
+        history=formatted_history[:-1],
+        system_instruction=_interview_system_instruction(job_description, difficulty),
     )
 
     # Check the result and return the appropriate response.
-    if not response or not response.text:
+    text = _response_text(response)
+    if not text:
         print(f"An error occurred in the interview chat endpoint after all fallbacks.")
         return None # Return None on total failure
 
-    return {"reply": response.text}
-    # --- END MODIFIED SECTION ---
-
-def generate_user_comparison(user1_profile: Dict[str, Any], user2_profile: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-    """
-    Compares two user profiles using Gemini to highlight strengths, skill gaps, and providing a recommendation.
-    """
-    
-    prompt = f"""
+    return {"reply": text}
+
+def _profile_skills(profile: Dict[str, Any]) -> Dict[str, str]:
+    """Profile skills keyed case-insensitively (first spelling wins); accepts a list or a {category: [skills]} dict."""
+    skills = profile.get('skills') or []
+    if isinstance(skills, dict):
+        skills = [skill for group in skills.values() if isinstance(group, list) for skill in group]
+    elif isinstance(skills, str):
+        skills = skills.split(',')
+    by_key: Dict[str, str] = {}
+    for skill in skills:
+        name = str(skill).strip()
+        if name: by_key.setdefault(name.lower(), name)
+    return by_key
+
+def _skill_overlap(user1_profile: Dict[str, Any], user2_profile: Dict[str, Any]) -> Dict[str, List[str]]:
+    # Plain set algebra: exact, and no output tokens spent asking the model for it
+    s1, s2 = _profile_skills(user1_profile), _profile_skills(user2_profile)
+    return {
+        "common_skills": [s1[k] for k in sorted(s1.keys() & s2.keys())],
+        "user1_distinct_skills": [s1[k] for k in sorted(s1.keys() - s2.keys())],
+        "user2_distinct_skills": [s2[k] for k in sorted(s2.keys() - s1.keys())],
+    }
+
+def _user_comparison_prompt(user1_profile: Dict[str, Any], user2_profile: Dict[str, Any]) -> str:
+    return f"""
     You are an expert HR Talent Analyst. Your task is to compare two candidates based on their profiles and provide a structured comparison.
     
     **Candidate 1:**
@@ -874,9 +1300,6 @@ def generate_user_comparison(user1_profile: Dict[str, Any], user2_profile: Dict[
     **Output JSON Schema:**
     Generate a SINGLE structured JSON object with the following keys. Do NOT use markdown.
     {{
-        "common_skills": ["List of skills both have"],
-        "user1_distinct_skills": ["Skills unique to Candidate 1"],
-        "user2_distinct_skills": ["Skills unique to Candidate 2"],
         "comparison_summary": "A concise paragraph comparing their overall profiles, highlighting who might be better suited for different types of roles.",
         "user1_strengths": ["Key strength 1", "Key strength 2"],
         "user2_strengths": ["Key strength 1", "Key strength 2"],
@@ -884,23 +1307,67 @@ def generate_user_comparison(user1_profile: Dict[str, Any], user2_profile: Dict[
     }}
     """
 
-    response = _call_gemini_with_fallback(prompt)
-    if not response: return None
-    
-    data = _safe_json_loads(response.text, fallback=None)
-    if not data:
-        print("\n--- ERROR: GEMINI FAILED TO GENERATE COMPARISON ---")
-        return None
-        
-    return data
+async def generate_user_comparisons(profile_pairs: List[Tuple[Dict[str, Any], Dict[str, Any]]]) -> List[Optional[Dict[str, Any]]]:
+    """
+    Compares several pairs of user profiles. All prompts are built up front and sent concurrently
+    through the shared Gemini dispatcher; results come back in pair order (None for a failed pair).
+    Common/distinct skills are computed locally and merged in; the model only writes the narrative fields.
+    """
+    # A pair with a missing profile has nothing to compare and is answered None without a call
+    valid = [i for i, (u1, u2) in enumerate(profile_pairs) if u1 and u2]
+    responses = await call_gemini_batch([_user_comparison_prompt(*profile_pairs[i]) for i in valid]) if valid else []
+    results: List[Optional[Dict[str, Any]]] = [None] * len(profile_pairs)
+    for i, response in zip(valid, responses):
+        data = _safe_json_loads(_response_text(response), fallback=None)
+        if not data or not isinstance(data, dict):
+            print("\n--- ERROR: GEMINI FAILED TO GENERATE COMPARISON ---")
+            continue
+        data.update(_skill_overlap(*profile_pairs[i]))
+        results[i] = data
+    return results
+
+async def generate_user_comparison(user1_profile: Dict[str, Any], user2_profile: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Compares two user profiles using Gemini to highlight strengths, skill gaps, and providing a recommendation.
+    """
+    return (await generate_user_comparisons([(user1_profile, user2_profile)]))[0]
 
 
+# Static part of the interview summary prompt, built once at import and sent as the system instruction
+_INTERVIEW_SUMMARY_SYSTEM = """
+    You are an expert career coach and technical recruiter. Your task is to analyze the following mock interview transcript and provide a performance summary.
+
+    **Your Analysis Task:**
+    Provide a detailed analysis in a valid JSON object with the following keys:
+    1.  `"overall_score"`: An integer from 0 to 100.
+    2.  `"strengths"`: A list of 2-3 positive points.
+    3.  `"areas_for_improvement"`: A list of 2-3 constructive points.
+    4.  `"overall_feedback"`: A concise summary paragraph.
+
+    **Critical Rules:**
+    - If the "CRITICAL CONTEXT" section indicates the interview was terminated, you MUST:
+      1. State the termination reason clearly at the beginning of the `overall_feedback`.
+      2. Assign an `overall_score` below 30.
+      3. List "Maintaining interview integrity" as the primary area for improvement.
+    - If there is a "Proctoring Note", incorporate it into your feedback on professionalism or focus.
+    - Your final output must be ONLY the valid JSON object.
+    """
+
 def get_interview_summary(job_description: str, history: List[Dict[str, str]], proctoring_data: Optional[Dict] = None) -> Optional[Dict[str, Any]]:
     """
     Analyzes the full interview transcript and provides a performance summary,
     now with special handling for malpractice and forced termination.
     """
-    transcript = "\n".join([f"{msg['role']}: {msg['content']}" for msg in history])
+    # Nothing was said and the interview wasn't terminated: there is nothing for the AI to assess
+    if not history and not (proctoring_data and proctoring_data.get('termination_reason')):
+        return {
+            "overall_score": 0,
+            "strengths": [],
+            "areas_for_improvement": [],
+            "overall_feedback": "No interview responses were recorded, so there is nothing to evaluate yet."
+        }
+    # Built once per summary; the finished prompt is what key rotation and the LLM cache reuse
+    transcript = "\n".join(f"{msg['role']}: {msg['content']}" for msg in history)
     
     # --- NEW: Build a proctoring context for the AI ---
     proctoring_context = ""
@@ -927,8 +1394,6 @@ def get_interview_summary(job_description: str, history: List[Dict[str, str]], p
                 proctoring_context = f"Proctoring Note: The candidate received warnings for: {', '.join(warnings)}."
 
     prompt = f"""
-    You are an expert career coach and technical recruiter. Your task is to analyze the following mock interview transcript and provide a performance summary.
-    
     {proctoring_context}
 
     **Job Description Context:**
@@ -940,29 +1405,15 @@ def get_interview_summary(job_description: str, history: List[Dict[str, str]], p
     ```
     {transcript}
     ```
-
-    **Your Analysis Task:**
-    Provide a detailed analysis in a valid JSON object with the following keys:
-    1.  `"overall_score"`: An integer from 0 to 100.
-    2.  `"strengths"`: A list of 2-3 positive points.
-    3.  `"areas_for_improvement"`: A list of 2-3 constructive points.
-    4.  `"overall_feedback"`: A concise summary paragraph.
-
-    **Critical Rules:**
-    - If the "CRITICAL CONTEXT" section indicates the interview was terminated, you MUST:
-      1. State the termination reason clearly at the beginning of the `overall_feedback`.
-      2. Assign an `overall_score` below 30.
-      3. List "Maintaining interview integrity" as the primary area for improvement.
-    - If there is a "Proctoring Note", incorporate it into your feedback on professionalism or focus.
-    - Your final output must be ONLY the valid JSON object.
     """
-    response = _call_gemini_with_fallback(prompt)
+    response = _call_gemini_with_fallback(prompt, system_instruction=_INTERVIEW_SUMMARY_SYSTEM)
 
-    if not response or not response.text:
+    text = _response_text(response)
+    if not text:
         print("Error generating interview summary after all fallbacks.")
         return None
 
-    summary_data = _safe_json_loads(response.text, fallback=None)
+    summary_data = _safe_json_loads(text, fallback=None)
     
     if not summary_data:
         print("\n--- ERROR: GEMINI FAILED TO GENERATE VALID INTERVIEW SUMMARY ---")
@@ -970,6 +1421,14 @@ def get_interview_summary(job_description: str, history: List[Dict[str, str]], p
 
     return summary_data
 
+_DOCX_PRINT_ORDER = ('personal_info', 'summary', 'skills', 'work_experience', 'internships', 'projects', 'education', 'certifications')
+# Sections rendered after the ordered ones: everything except these (and the ordered sections themselves)
+_DOCX_EXCLUDED_SECTIONS = frozenset(_DOCX_PRINT_ORDER) | {'resume_metadata', 'raw_text', 'optimized_summary'}
+
+def _docx_date(value: Any) -> Any:
+    # Date fields may hold Firestore timestamps; show them as readable strings
+    return value.strftime("%b %d, %Y") if isinstance(value, datetime) else value
+
 def save_resume_json_to_docx(resume_json: Dict[str, Any]) -> Document:
     doc = Document()
     def add_heading(text: Optional[str], level: int = 1):
@@ -984,8 +1443,6 @@ def save_resume_json_to_docx(resume_json: Dict[str, Any]) -> Document:
             run.font.size = Pt(11)
             if style == "List Bullet": p.paragraph_format.left_indent = Pt(36)
             
-    print_order = ['personal_info', 'summary', 'skills', 'work_experience', 'internships', 'projects', 'education', 'certifications']
-    
     name_for_title = resume_json.get('personal_info', {}).get('name', '')
     if name_for_title:
         doc.add_heading(name_for_title, level=0)
@@ -999,7 +1456,7 @@ def save_resume_json_to_docx(resume_json: Dict[str, Any]) -> Document:
     if contact_info_parts:
         add_para(_smart_join(contact_info_parts))
     
-    for section in print_order:
+    for section in _DOCX_PRINT_ORDER:
         if section in resume_json:
             content = resume_json[section]
             if section == 'personal_info':
@@ -1020,21 +1477,15 @@ def save_resume_json_to_docx(resume_json: Dict[str, Any]) -> Document:
                     if isinstance(item, str):
                         add_para(item, style="List Bullet")
                     elif isinstance(item, dict):
-                        # Ensure any dates/timestamps within item are converted to string before joining/displaying
-                        item_copy = item.copy()
-                        for k, v in item_copy.items():
-                            if isinstance(v, datetime): # CORRECTED: Check for datetime.datetime objects
-                                item_copy[k] = v.strftime("%b %d, %Y") # Format as readable string
-                        
-                        header_parts = [item_copy.get("title"), item_copy.get("name"), item_copy.get("role"), item_copy.get("degree"), item_copy.get("institution")]
-                        header = _smart_join(header_parts)
+                        # Only the displayed fields are read; the item itself is never copied
+                        get = item.get
+                        header = _smart_join([get("title"), get("name"), get("role"), get("degree"), get("institution")])
                         if header: add_para(header, bold=True)
                         
-                        sub_header_parts = [item_copy.get("company"), item_copy.get("duration")]
-                        sub_header = _smart_join(sub_header_parts)
+                        sub_header = _smart_join([get("company"), _docx_date(get("duration"))])
                         if sub_header: add_para(sub_header)
                         
-                        desc = item_copy.get("description", [])
+                        desc = get("description", [])
                         if isinstance(desc, list):
                             for bullet in desc:
                                 if _norm(bullet): add_para(str(bullet), style="List Bullet")
@@ -1045,7 +1496,7 @@ def save_resume_json_to_docx(resume_json: Dict[str, Any]) -> Document:
                 add_para(content)
             
     for section, content in resume_json.items():
-        if section not in print_order and section not in ['resume_metadata', 'raw_text','optimized_summary']:
+        if section not in _DOCX_EXCLUDED_SECTIONS:
             add_heading(section.replace("_", " ").title(), level=2)
             if isinstance(content, list):
                 for item in content: add_para(str(item), style="List Bullet")
@@ -1091,33 +1542,32 @@ def get_feedback_on_transcript(transcript: str, question: str, job_description:
         print(f"CRITICAL ERROR in get_feedback_on_transcript: {e}")
         return None # Return None on failure
     
-def process_audio_answer(audio_content: bytes, question: str, job_description: str) -> Optional[Dict[str, str]]:
-    """
-    The new, robust pipeline for interview analysis using Groq + Whisper.
-    1. Transcribes audio to text using the Whisper-1 model via Groq API.
-    2. Sends the high-quality transcript to Gemini for feedback.
-    """
-    try:
-        # Step 1: Transcribe Audio using Whisper-1 via Groq
-        print("DEBUG(ai_core): Sending audio content to Groq API for Whisper transcription...")
-        groq_client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-        
-        # We need to wrap the bytes content in a file-like object for the API
-        audio_file = ("answer.webm", audio_content, "audio/webm")
-        
-        transcription = groq_client.audio.transcriptions.create(
-            file=audio_file,
-            model="whisper-large-v3", # State-of-the-art model
-        )
-        
-        transcript = transcription.text
-        if not transcript or not transcript.strip():
-            raise ValueError("Transcription result was empty.")
-            
-        print(f"DEBUG(ai_core): High-quality transcript received: '{transcript}'")
-
-        # Step 2: Send transcript to Gemini for analysis
-        prompt = f"""
+_WHISPER_MODEL = "whisper-large-v3" # State-of-the-art model
+# One Groq client reused across answers, so its HTTP connection pool survives between requests
+_whisper_client: Optional[Groq] = None
+
+def _get_whisper_client() -> Groq:
+    global _whisper_client
+    if _whisper_client is None:
+        _whisper_client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+    return _whisper_client
+
+def _transcribe_audio(audio_content: bytes) -> str:
+    """Transcribes audio to text using Whisper via the Groq API. Raises if the transcript is empty."""
+    print("DEBUG(ai_core): Sending audio content to Groq API for Whisper transcription...")
+    # A (name, bytes, mime) tuple rather than a BytesIO: httpx sizes a bytes body up front (Content-Length,
+    # no chunked encoding) and sends the buffer as-is, whereas a file object would be read into a second copy
+    audio_file = ("answer.webm", audio_content, "audio/webm")
+    transcription = _get_whisper_client().audio.transcriptions.create(file=audio_file, model=_WHISPER_MODEL)
+
+    transcript = transcription.text
+    if not transcript or not transcript.strip():
+        raise ValueError("Transcription result was empty.")
+    print(f"DEBUG(ai_core): High-quality transcript received: '{transcript}'")
+    return transcript
+
+def _audio_answer_prompt(transcript: str, question: str, job_description: str) -> str:
+    return f"""
         You are an expert career coach analyzing a mock interview answer.
         Job Description Context: {job_description}
         The question asked was: "{question}"
@@ -1130,45 +1580,53 @@ def process_audio_answer(audio_content: bytes, question: str, job_description: s
         Rule: Respond ONLY with the valid JSON object.
         """
 
-        gemini_response = _call_gemini_with_fallback(prompt)
+def _audio_answer_error(question: str, e: Exception) -> Dict[str, str]:
+    print(f"CRITICAL ERROR in process_audio_answer: {e}")
+    return {
+        "feedback": "A technical error occurred while processing your answer. Please try recording again for the same question.",
+        "next_question": question
+    }
+
+def process_audio_answer(audio_content: bytes, question: str, job_description: str) -> Optional[Dict[str, str]]:
+    """
+    The new, robust pipeline for interview analysis using Groq + Whisper.
+    1. Transcribes audio to text using the Whisper-1 model via Groq API.
+    2. Sends the high-quality transcript to Gemini for feedback.
+    """
+    try:
+        transcript = _transcribe_audio(audio_content)
+        gemini_response = _call_gemini_with_fallback(_audio_answer_prompt(transcript, question, job_description))
         if not gemini_response:
             raise Exception("Gemini call failed during feedback generation.")
 
         return _safe_json_loads(gemini_response.text)
 
     except Exception as e:
-        print(f"CRITICAL ERROR in process_audio_answer: {e}")
-        return {
-            "feedback": "A technical error occurred while processing your answer. Please try recording again for the same question.",
-            "next_question": question
-        }
-def evaluate_and_adjust_roadmap(current_roadmap: dict, performance_summary: dict, trend_data: Optional[dict] = None) -> dict:
+        return _audio_answer_error(question, e)
+
+async def process_audio_answer_async(audio_content: bytes, question: str, job_description: str) -> Optional[Dict[str, str]]:
     """
-    Analyzes user performance against their current roadmap and adjusts it dynamically.
-    Uses collective trend data (this week vs previous weeks) to determine if an upgrade or downgrade is needed.
+    Async version of `process_audio_answer`: transcription runs in a worker thread and the feedback
+    call goes through the shared Gemini dispatcher, so the event loop stays free during both round trips.
     """
+    try:
+        transcript = await asyncio.to_thread(_transcribe_audio, audio_content)
+        gemini_response = await gemini_dispatcher.submit(_audio_answer_prompt(transcript, question, job_description))
+        if not gemini_response:
+            raise Exception("Gemini call failed during feedback generation.")
 
-    trend_context = ""
-    if trend_data:
-        comp_score = trend_data.get('composite_score', 0)
-        trend_context = f"""
-    **COLLECTIVE PERFORMANCE & TRENDS:**
-    - OVERALL COMPOSITE SCORE: {comp_score}% (Weighted: 30% Progress, 25% Assessments, 25% Interviews, 20% ATS)
-    - Assessments: This Week ({trend_data['assessments']['recent']}%) vs Previous ({trend_data['assessments']['prior']}%) | Total Avg: {trend_data['assessments']['total']}%
-    - Interviews: This Week ({trend_data['interviews']['recent']}%) vs Previous ({trend_data['interviews']['prior']}%) | Total Avg: {trend_data['interviews']['total']}%
-    - ATS Scores: This Week ({trend_data['ats']['recent']}%) vs Previous ({trend_data['ats']['prior']}%) | Total Avg: {trend_data['ats']['total']}%
-    - Progress: Tasks Completed This Week ({trend_data['progress']['recent_count']}) vs Previous ({trend_data['progress']['prior_count']}) | Total: {trend_data['progress']['total_count']}
-    """
+        return _safe_json_loads(gemini_response.text)
 
-    prompt = f"""
+    except Exception as e:
+        return _audio_answer_error(question, e)
+
+async def process_audio_answers(answers: List[Tuple[bytes, str, str]]) -> List[Optional[Dict[str, str]]]:
+    """Processes several (audio_content, question, job_description) answers concurrently, e.g. a recorded session."""
+    return await asyncio.gather(*[process_audio_answer_async(audio, q, jd) for audio, q, jd in answers])
+
+# Static part of the roadmap adjustment prompt, built once at import and sent as the system instruction
+_ROADMAP_ADJUSTMENT_SYSTEM = """
     You are an AI Career Performance Analyst. Your task is to evaluate a user's progress and dynamically adjust their career roadmap.
-    
-    **CURRENT ROADMAP:**
-    `json
-    {json.dumps(current_roadmap, indent=2)}
-    `
-    
-    {trend_context}
 
     **YOUR EVALUATION CRITERIA (Weighted by Composite Score):**
     1. **UPGRADE (Accelerate):** If the *Composite Score* is high (>80%), significantly accelerate the roadmap. Introduce advanced frameworks, complex cloud architecture, or system design projects. Reduce durations of future tasks.
@@ -1182,15 +1640,15 @@ def evaluate_and_adjust_roadmap(current_roadmap: dict, performance_summary: dict
     You MUST also include a 'performance_feedback' string (max 100 words) summarizing the collective trend and why you made these changes.
 
     **JSON OUTPUT SCHEMA:**
-    {{
+    {
         "performance_feedback": "string",
         "is_updated": true,
-        "updated_roadmap": {{
+        "updated_roadmap": {
              "detailed_roadmap": [...],
              "suggested_projects": [...],
              "skills_to_learn_summary": [...]
-        }}
-    }}
+        }
+    }
 
     **Rules:**
     - Return ONLY the valid JSON object.
@@ -1203,11 +1661,45 @@ def evaluate_and_adjust_roadmap(current_roadmap: dict, performance_summary: dict
     - **PRESERVATION:** You MUST preserve the names of tasks in 'detailed_roadmap' that have `"is_completed": true` to maintain historical consistency, but you may move them to an earlier "Completed Progress" section or keep them in their original phases if it makes logical sense for the new timeline.
 
     """
+
+def evaluate_and_adjust_roadmap(current_roadmap: dict, performance_summary: dict, trend_data: Optional[dict] = None) -> dict:
+    """
+    Analyzes user performance against their current roadmap and adjusts it dynamically.
+    Uses collective trend data (this week vs previous weeks) to determine if an upgrade or downgrade is needed.
+    """
+    # Without any performance data the criteria below can't be applied; keep the roadmap as it is
+    if not performance_summary and not trend_data:
+        return {
+            "performance_feedback": "Not enough activity yet to evaluate your progress. Keep working through your roadmap!",
+            "is_updated": False,
+            "updated_roadmap": current_roadmap
+        }
+
+    trend_context = ""
+    if trend_data:
+        comp_score = trend_data.get('composite_score', 0)
+        trend_context = f"""
+    **COLLECTIVE PERFORMANCE & TRENDS:**
+    - OVERALL COMPOSITE SCORE: {comp_score}% (Weighted: 30% Progress, 25% Assessments, 25% Interviews, 20% ATS)
+    - Assessments: This Week ({trend_data['assessments']['recent']}%) vs Previous ({trend_data['assessments']['prior']}%) | Total Avg: {trend_data['assessments']['total']}%
+    - Interviews: This Week ({trend_data['interviews']['recent']}%) vs Previous ({trend_data['interviews']['prior']}%) | Total Avg: {trend_data['interviews']['total']}%
+    - ATS Scores: This Week ({trend_data['ats']['recent']}%) vs Previous ({trend_data['ats']['prior']}%) | Total Avg: {trend_data['ats']['total']}%
+    - Progress: Tasks Completed This Week ({trend_data['progress']['recent_count']}) vs Previous ({trend_data['progress']['prior_count']}) | Total: {trend_data['progress']['total_count']}
+    """
+
+    prompt = f"""
+    **CURRENT ROADMAP:**
+    `json
+    {_compact_json(current_roadmap)}
+    `
     
-    response = _call_gemini_with_fallback(prompt)
+    {trend_context}
+    """
+    
+    response = _call_gemini_with_fallback(prompt, system_instruction=_ROADMAP_ADJUSTMENT_SYSTEM)
     if not response: return None
     
-    data = _safe_json_loads(response.text, fallback=None)
+    data = _safe_json_loads(_response_text(response), fallback=None)
     if not data:
         print("\n--- ERROR: GEMINI FAILED TO ADJUST ROADMAP ---")
         return None
@@ -1219,6 +1711,8 @@ def generate_skill_trends_analysis(user_skills: List[str], market_data: List[Dic
     Analyzes user skills against market trends to provide actionable insights.
     Updated to match Frontend 'trends.js' expectations.
     """
+    if not user_skills and not market_data:
+        return {"analysis_summary": "Add skills to your profile to get a personalized market analysis.", "recommendations": []}
     try:
         # If no user skills, provide generic advice
         skills_text = ', '.join(user_skills) if user_skills else "General Software Engineering"
@@ -1229,7 +1723,7 @@ def generate_skill_trends_analysis(user_skills: List[str], market_data: List[Dic
         **User Skills:** {skills_text}
         
         **Market Trend Data:**
-        {json.dumps(market_data, indent=2)}
+        {_compact_json(market_data)}
         
         **Task:**
         1. create a concise "Analysis Summary" (2 sentences) about how the user's skills align with the market.
@@ -1251,7 +1745,7 @@ def generate_skill_trends_analysis(user_skills: List[str], market_data: List[Dic
         response = _call_gemini_with_fallback(prompt)
         if not response: return None
         
-        return _safe_json_loads(response.text, fallback=None)
+        return _safe_json_loads(_response_text(response), fallback=None)
     except Exception as e:
         print(f"Error in generate_skill_trends_analysis: {e}")
         return None
@@ -1289,13 +1783,9 @@ def extract_event_details(subject: str, body: str, date: Any = None) -> Dict[str
     """
     try:
         response = _call_gemini_with_fallback(prompt)
-        text_content = response.text if response and hasattr(response, 'text') else str(response)
-        # Clean specific markdown wrapping if present
-        clean_text = text_content.replace("```json", "").replace("```", "").strip()
-        if "null" in clean_text.lower() and len(clean_text) < 10: return {}
-        
-        data = json.loads(clean_text)
-        if data: data['is_event'] = True # Ensure this flag is set if data exists
+        data = _safe_json_loads(_response_text(response), fallback=None)
+        if not isinstance(data, dict) or not data: return {} # null (no event) or unparsable
+        data['is_event'] = True # Ensure this flag is set if data exists
         return data
     except Exception as e:
         print(f"Error extracting event details: {e}")
@@ -1327,21 +1817,16 @@ def draft_application_email(job_desc: str, resume_summary: str, email_type: str,
     
     try:
         response = _call_gemini_with_fallback(prompt)
-        if response and hasattr(response, 'text'):
-            return response.text
-        elif response and isinstance(response, str):
-            return response
+        text = response if isinstance(response, str) else _response_text(response)
+        if text:
+            return text
         return "Error: Empty response from AI."
     except Exception as e:
         print(f"Error drafting email: {e}")
         return f"Subject: Application Request\n\nDear Hiring Team,\n\nPlease accept this email as my application. (Error generating full draft: {str(e)})\n\nSincerely,\n{sign_off_name}"
 
-def analyze_interview_feedback(current_analysis: Dict, feedback: str) -> Dict[str, Any]:
-    """
-    Analyzes raw interview notes/feedback to update the user's cumulative interview profile.
-    Generates radar chart scores and lists strengths/weaknesses.
-    """
-    prompt = f"""
+def _interview_feedback_prompt(current_analysis: Dict, feedback: str) -> str:
+    return f"""
     Analyze the following raw notes/feedback from a recent technical interview.
     Update the cumulative interview profile of the candidate.
 
@@ -1349,7 +1834,7 @@ def analyze_interview_feedback(current_analysis: Dict, feedback: str) -> Dict[st
     "{feedback}"
 
     Current Cumulative Stats (for context, do not just repeat these, evolve them based on new data):
-    {json.dumps(current_analysis.get('skill_scores', {}), indent=2)}
+    {_compact_json(current_analysis.get('skill_scores', {}))}
 
     Output strictly in JSON format:
     {{
@@ -1366,11 +1851,13 @@ def analyze_interview_feedback(current_analysis: Dict, feedback: str) -> Dict[st
         "strengths": ["List of top 3 strengths identified in this specific session"]
     }}
     """
+
+def _parse_interview_feedback(response: Optional[Any], current_analysis: Dict) -> Dict[str, Any]:
     try:
-        response = _call_gemini_with_fallback(prompt)
-        text_content = response.text if response and hasattr(response, 'text') else str(response)
-        clean_text = text_content.replace("```json", "").replace("```", "").strip()
-        return json.loads(clean_text)
+        data = _safe_json_loads(_response_text(response), fallback=None)
+        if not isinstance(data, dict):
+            raise ValueError("response is not a JSON object")
+        return data
     except Exception as e:
         print(f"Error analyzing interview feedback: {e}")
         return {
@@ -1382,3 +1869,18 @@ def analyze_interview_feedback(current_analysis: Dict, feedback: str) -> Dict[st
             "weaknesses": ["Error parsing feedback"],
             "strengths": []
         }
+
+async def analyze_interview_feedback_batch(items: List[Tuple[Dict, str]]) -> List[Dict[str, Any]]:
+    """
+    Analyzes several (current_analysis, feedback) pairs concurrently through the shared Gemini dispatcher.
+    Results come back in input order; a failed item gets the same fallback profile as the single call.
+    """
+    responses = await call_gemini_batch([_interview_feedback_prompt(analysis, feedback) for analysis, feedback in items])
+    return [_parse_interview_feedback(response, analysis) for response, (analysis, _) in zip(responses, items)]
+
+async def analyze_interview_feedback(current_analysis: Dict, feedback: str) -> Dict[str, Any]:
+    """
+    Analyzes raw interview notes/feedback to update the user's cumulative interview profile.
+    Generates radar chart scores and lists strengths/weaknesses.
+    """
+    return (await analyze_interview_feedback_batch([(current_analysis, feedback)]))[0]
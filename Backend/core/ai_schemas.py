@@ -0,0 +1,56 @@
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
+
+# Backend/core/ai_schemas.py
+
+# Lenient models for the JSON the AI returns. They only pin down the fields the app actually reads
+# (extra keys are kept), and are used to decide whether a response is usable or needs a retry.
+
+class _AIOutput(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+class ResumeBundle(_AIOutput):
+    structure: Dict[str, Any] = Field(min_length=1)
+    skills: Dict[str, List[str]] = Field(default_factory=dict)
+
+class FullResumeAnalysis(_AIOutput):
+    overall_resume_score: int
+    ats_optimization_score: int
+    overall_resume_grade: str = "N/A"
+    key_strengths: List[str] = Field(default_factory=list)
+    areas_for_improvement: List[str] = Field(default_factory=list)
+    overall_assessment: str = ""
+
+class AssessmentQuestion(_AIOutput):
+    question_id: str
+    question_text: str
+    question_type: str
+    options: Optional[List[str]] = None
+    correct_answer_keys: List[str] = Field(default_factory=list)
+
+class TutorExplanation(_AIOutput):
+    analogy: str
+    technical_definition: str
+
+class CareerRoadmap(_AIOutput):
+    domain: str
+    detailed_roadmap: List[Dict[str, Any]] = Field(min_length=1)
+
+class LinkedInContent(_AIOutput):
+    # Section requests return only part of the profile, so every field is optional
+    headlines: Optional[List[str]] = None
+    about_section: Optional[str] = None
+    optimized_experiences: Optional[List[Dict[str, Any]]] = None
+    optimized_projects: Optional[List[Dict[str, Any]]] = None
+
+class GradedAnswer(_AIOutput):
+    score: int = Field(ge=0, le=100)
+    rationale: str = ""
+
+RESUME_BUNDLE_ADAPTER = TypeAdapter(ResumeBundle)
+FULL_RESUME_ANALYSIS_ADAPTER = TypeAdapter(FullResumeAnalysis)
+ASSESSMENT_QUESTIONS_ADAPTER = TypeAdapter(List[AssessmentQuestion])
+TUTOR_EXPLANATION_ADAPTER = TypeAdapter(TutorExplanation)
+CAREER_ROADMAP_ADAPTER = TypeAdapter(CareerRoadmap)
+LINKEDIN_CONTENT_ADAPTER = TypeAdapter(LinkedInContent)
+GRADED_ANSWER_ADAPTER = TypeAdapter(GradedAnswer)
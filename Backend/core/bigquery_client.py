@@ -1,10 +1,98 @@
 from google.cloud import bigquery
 from google.oauth2 import service_account
+from google.auth.transport.requests import AuthorizedSession
+from requests.adapters import HTTPAdapter
+from google.api_core.exceptions import NotFound
 from pathlib import Path
 import os
+import asyncio
+import logging
+import hashlib
+from datetime import datetime, timezone
 import pandas as pd
+import orjson
+from functools import lru_cache
+from core.ttl_cache import LRUCache
 
-import json
+logger = logging.getLogger(__name__)
+
+# Aggregated viability stats, rebuilt once per ingest (load_data truncates and reloads skills_demand,
+# which would force a full refresh of a materialized view anyway). Reads scan one row per keyword.
+VIABILITY_TABLE_ID = 'skills_demand_viability'
+# Superseded by VIABILITY_TABLE_ID; dropped on refresh so BigQuery stops maintaining it
+_LEGACY_VIABILITY_MV_ID = 'skills_demand_viability_mv'
+
+# Table label holding a hash of the last loaded frame; an identical resync skips the load job entirely
+# (load jobs count against BigQuery's per-table daily quota)
+CONTENT_HASH_LABEL = 'content_hash'
+
+SKILLS_DEMAND_SCHEMA = [
+    bigquery.SchemaField("date", "DATE"),
+    bigquery.SchemaField("keyword", "STRING"),
+    bigquery.SchemaField("interest_value", "INTEGER"),
+]
+
+# Viability stats only change when an ingest refreshes them; cached here and cleared by the refresh
+VIABILITY_CACHE_TTL = int(os.getenv("VIABILITY_CACHE_TTL", "3600"))
+_VIABILITY_CACHE = LRUCache(max_size=1, ttl=VIABILITY_CACHE_TTL)
+
+# Viability categories, indexed by the category_code the stats table stores (an INT64 instead of a
+# repeated label string per row). Order must match the CASE in refresh_viability_stats.
+VIABILITY_CATEGORIES = ("Fad / Risky", "Long-Term Staple", "Emerging High-Growth", "Stable / Niche")
+
+# The viability read is deterministic (no CURRENT_DATE(); that only runs in the ingest-time refresh) and its
+# SQL text is fixed per client, so repeat reads are served from BigQuery's 24h results cache until the
+# stats table is rebuilt
+_CACHED_QUERY_CONFIG = bigquery.QueryJobConfig(use_query_cache=True)
+
+# HTTP connections kept open per host by the shared client, sized for concurrent requests
+BIGQUERY_POOL_SIZE = int(os.getenv("BIGQUERY_POOL_SIZE", "16"))
+
+def _new_client(credentials, project_id: str):
+    session = AuthorizedSession(credentials)
+    adapter = HTTPAdapter(pool_connections=BIGQUERY_POOL_SIZE, pool_maxsize=BIGQUERY_POOL_SIZE)
+    session.mount("https://", adapter)
+    return bigquery.Client(credentials=credentials, project=project_id, _http=session)
+
+# Credentials parsing (JSON decode + RSA key load) and the client's HTTP session are built once per
+# process; every BigQueryClient instance shares them
+@lru_cache(maxsize=None)
+def _build_client(project_id: str):
+    # 1. Try Environment Variable (Production / Deployment)
+    # Check specific BigQuery var first, then generic JSON var
+    creds_json_str = os.getenv("BIGQUERY_SERVICE_ACCOUNT_JSON") or os.getenv("GOOGLE_APPLICATION_CREDENTIALS_JSON")
+    
+    if creds_json_str:
+        try:
+            creds_dict = orjson.loads(creds_json_str)
+            credentials = service_account.Credentials.from_service_account_info(creds_dict)
+            logger.info("✅ BigQuery Client initialized via Environment Variable.")
+            return _new_client(credentials, project_id)
+        except orjson.JSONDecodeError:
+            logger.error("❌ Error: BIGQUERY_SERVICE_ACCOUNT_JSON contain invalid JSON.")
+            return None
+        except Exception as e:
+            logger.error("❌ Error initializing BigQuery from Env Var: %s", e)
+            return None
+
+    # 2. Fallback to local file (Development)
+    current_dir = Path(__file__).parent.parent # Backend/
+    creds_path = current_dir / "service-account.json"
+    
+    if not creds_path.exists():
+        logger.warning(
+            "⚠️ BigQuery credentials not found. Local: missing 'service-account.json' in %s; "
+            "Remote: 'BIGQUERY_SERVICE_ACCOUNT_JSON' env var not set.", current_dir
+        )
+        return None
+        
+    try:
+        credentials = service_account.Credentials.from_service_account_file(str(creds_path))
+        logger.info("✅ BigQuery Client initialized via local 'service-account.json'.")
+        return _new_client(credentials, project_id)
+    except Exception as e:
+        logger.error("❌ Error initializing BigQuery from local file: %s", e)
+        return None
 
 class BigQueryClient:
     def __init__(self):
@@ -13,88 +101,115 @@ class BigQueryClient:
         self.dataset_id = 'trends_data'
         self.table_id = 'skills_demand'
         self.client = self._get_client()
+        # Table ids and SQL depend only on the ids above, so they are built once here instead of per call
+        self._full_table_id = f"{self.project_id}.{self.dataset_id}.{self.table_id}"
+        self._viability_sql = f"""
+        SELECT keyword, avg_interest, volatility, growth_delta, category_code
+        FROM `{self.project_id}.{self.dataset_id}.{VIABILITY_TABLE_ID}`
+        ORDER BY avg_interest DESC
+        """
 
     def _get_client(self):
-        # 1. Try Environment Variable (Production / Deployment)
-        # Check specific BigQuery var first, then generic JSON var
-        creds_json_str = os.getenv("BIGQUERY_SERVICE_ACCOUNT_JSON") or os.getenv("GOOGLE_APPLICATION_CREDENTIALS_JSON")
-        
-        if creds_json_str:
-            try:
-                creds_dict = json.loads(creds_json_str)
-                credentials = service_account.Credentials.from_service_account_info(creds_dict)
-                print("✅ BigQuery Client initialized via Environment Variable.")
-                return bigquery.Client(credentials=credentials, project=self.project_id)
-            except json.JSONDecodeError:
-                print("❌ Error: BIGQUERY_SERVICE_ACCOUNT_JSON contain invalid JSON.")
-                return None
-            except Exception as e:
-                print(f"❌ Error initializing BigQuery from Env Var: {e}")
-                return None
-
-        # 2. Fallback to local file (Development)
-        current_dir = Path(__file__).parent.parent # Backend/
-        creds_path = current_dir / "service-account.json"
-        
-        if not creds_path.exists():
-            print(f"⚠️ Warning: BigQuery credentials not found.")
-            print(f"   - Local: Missing 'service-account.json' in {current_dir}")
-            print(f"   - Remote: 'BIGQUERY_SERVICE_ACCOUNT_JSON' env var not set.")
-            return None
-            
-        try:
-            credentials = service_account.Credentials.from_service_account_file(str(creds_path))
-            print("✅ BigQuery Client initialized via local 'service-account.json'.")
-            return bigquery.Client(credentials=credentials, project=self.project_id)
-        except Exception as e:
-            print(f"❌ Error initializing BigQuery from local file: {e}")
-            return None
+        return _build_client(self.project_id)
 
     def load_data(self, df: pd.DataFrame):
         """Loads a pandas DataFrame into BigQuery."""
         if not self.client:
             raise Exception("BigQuery client not initialized (missing credentials?)")
             
-        full_table_id = f"{self.project_id}.{self.dataset_id}.{self.table_id}"
+        full_table_id = self._full_table_id
         
         job_config = bigquery.LoadJobConfig(
             # Append to history, or WRITE_TRUNCATE if we want fresh every time.
             # For "Trends history", we might want to keep adding? 
             # But duplicate data is bad. Let's assume we are resyncing the whole 5-year view for now.
             write_disposition="WRITE_TRUNCATE", 
-            autodetect=True,
+            # Columnar Parquet (via pyarrow) instead of row-wise JSON: smaller upload, faster to serialize
+            source_format=bigquery.SourceFormat.PARQUET,
+            schema=SKILLS_DEMAND_SCHEMA,
+            # Monthly partitions + keyword clustering let date-window and per-keyword queries prune
+            time_partitioning=bigquery.TimePartitioning(type_=bigquery.TimePartitioningType.MONTH, field="date"),
+            clustering_fields=["keyword"],
         )
+        # The partition column must be a DATE, not the timestamp the trends frame carries
+        df = df.assign(date=pd.to_datetime(df["date"]).dt.date)
+        content_hash = hashlib.sha256(pd.util.hash_pandas_object(df, index=False).values.tobytes()).hexdigest()[:32]
+        table = self._get_partitioned_table(full_table_id)
+        if table is not None and (table.labels or {}).get(CONTENT_HASH_LABEL) == content_hash:
+            logger.info("%s already holds this data; skipping load.", full_table_id)
+            # The stats windows are relative to CURRENT_DATE(), so unchanged data still needs a daily rebuild
+            if self._viability_stats_stale():
+                self.refresh_viability_stats()
+            return
 
         job = self.client.load_table_from_dataframe(
             df, full_table_id, job_config=job_config
         )
         job.result()  # Wait for the job to complete.
-        print(f"Loaded {job.output_rows} rows into {full_table_id}.")
+        logger.info("Loaded %s rows into %s.", job.output_rows, full_table_id)
 
-    def query_viability_stats(self):
+        table = self.client.get_table(full_table_id)
+        table.labels = {**(table.labels or {}), CONTENT_HASH_LABEL: content_hash}
+        self.client.update_table(table, ["labels"])
+        self.refresh_viability_stats()
+
+    async def load_data_async(self, df: pd.DataFrame):
         """
-        Runs SQL analysis to determine viability stats:
-        - Avg Interest (Popularity)
-        - Std Dev (Volatility/Risk)
-        - Slope (Growth Trend - simplified proxy)
+        Async version of `load_data` for request handlers: the upload, load job wait and stats refresh
+        all block on BigQuery, so the whole sequence runs in a worker thread instead of on the event loop.
         """
-        if not self.client:
-            return []
+        await asyncio.to_thread(self.load_data, df)
+
+    def _get_partitioned_table(self, full_table_id: str):
+        """Returns the existing table, or None if it is missing or had to be dropped."""
+        try:
+            table = self.client.get_table(full_table_id)
+        except NotFound:
+            return None
+        # A truncating load can't change an existing table's partitioning; tables created by older
+        # (autodetect, unpartitioned) loads are dropped so the load recreates them partitioned
+        if table.time_partitioning is None:
+            logger.info("Recreating %s with monthly partitioning.", full_table_id)
+            self.client.delete_table(full_table_id)
+            return None
+        return table
+
+    def _viability_stats_stale(self) -> bool:
+        """True if the stats table is missing or was last rebuilt before today (UTC)."""
+        try:
+            stats_table = self.client.get_table(f"{self.project_id}.{self.dataset_id}.{VIABILITY_TABLE_ID}")
+        except NotFound:
+            return True
+        return stats_table.modified is None or stats_table.modified.date() < datetime.now(timezone.utc).date()
 
+    def refresh_viability_stats(self):
+        """Recomputes the per-keyword viability table from skills_demand. Called from the ingest path only."""
+        table = self._full_table_id
         # Complex SQL to crunch numbers
         # We calculate standard dev and average. 
         # For 'Growth', we'll compare the Avg of the LAST 6 months vs the FIRST 6 months of the period
         sql = f"""
-        WITH stats AS (
+        DROP MATERIALIZED VIEW IF EXISTS `{self.project_id}.{self.dataset_id}.{_LEGACY_VIABILITY_MV_ID}`;
+        CREATE OR REPLACE TABLE `{self.project_id}.{self.dataset_id}.{VIABILITY_TABLE_ID}`
+        CLUSTER BY keyword AS
+        WITH bounds AS (
+            -- Window edges computed once (not per row): end of the oldest 6 months, start of the latest 6
+            SELECT
+                DATE_ADD(MIN(date), INTERVAL 6 MONTH) as old_cut,
+                DATE_SUB(CURRENT_DATE(), INTERVAL 6 MONTH) as recent_cut
+            FROM `{table}`
+        ),
+        stats AS (
             SELECT 
                 keyword,
                 AVG(interest_value) as avg_interest,
                 STDDEV(interest_value) as volatility,
                 -- Simple growth metric: Avg of recent vs old
                 -- (Note: This assumes we have date present. We need to ensure 'date' is stored)
-                AVG(CASE WHEN date >= DATE_SUB(CURRENT_DATE(), INTERVAL 6 MONTH) THEN interest_value END) as recent_avg,
-                AVG(CASE WHEN date <= DATE_ADD((SELECT MIN(date) FROM `{self.project_id}.{self.dataset_id}.{self.table_id}`), INTERVAL 6 MONTH) THEN interest_value END) as old_avg
-            FROM `{self.project_id}.{self.dataset_id}.{self.table_id}`
+                AVG(CASE WHEN date >= bounds.recent_cut THEN interest_value END) as recent_avg,
+                AVG(CASE WHEN date <= bounds.old_cut THEN interest_value END) as old_avg
+            FROM `{table}`
+            CROSS JOIN bounds
             GROUP BY keyword
         )
         SELECT 
@@ -103,14 +218,49 @@ class BigQueryClient:
             volatility,
             (recent_avg - old_avg) as growth_delta,
             CASE 
-                WHEN volatility > 20 AND avg_interest < 40 THEN 'Fad / Risky'
-                WHEN avg_interest > 50 AND volatility < 15 THEN 'Long-Term Staple'
-                WHEN (recent_avg - old_avg) > 15 THEN 'Emerging High-Growth'
-                ELSE 'Stable / Niche'
-            END as category
+                WHEN volatility > 20 AND avg_interest < 40 THEN 0 -- Fad / Risky
+                WHEN avg_interest > 50 AND volatility < 15 THEN 1 -- Long-Term Staple
+                WHEN (recent_avg - old_avg) > 15 THEN 2 -- Emerging High-Growth
+                ELSE 3 -- Stable / Niche
+            END as category_code
         FROM stats
-        ORDER BY avg_interest DESC
         """
-        
-        query_job = self.client.query(sql)
-        return [dict(row) for row in query_job]
+        self.client.query(sql).result()
+        _VIABILITY_CACHE.clear()
+        logger.info("Refreshed viability stats in %s.%s.", self.dataset_id, VIABILITY_TABLE_ID)
+
+    def query_viability_stats(self):
+        """
+        Returns the viability stats precomputed by refresh_viability_stats:
+        - Avg Interest (Popularity)
+        - Std Dev (Volatility/Risk)
+        - Slope (Growth Trend - simplified proxy)
+        """
+        if not self.client:
+            return []
+
+        sql = self._viability_sql
+        cached = _VIABILITY_CACHE.get(VIABILITY_TABLE_ID)
+        if cached is not None:
+            return cached
+        try:
+            records = self._fetch_records(sql)
+        except NotFound:
+            # Reads never rebuild the table; the next ingest (load_data) creates it
+            logger.warning("%s.%s does not exist yet; run a trends sync to build it.", self.dataset_id, VIABILITY_TABLE_ID)
+            return []
+        _VIABILITY_CACHE.set(VIABILITY_TABLE_ID, records)
+        return records
+
+    def _fetch_records(self, sql: str):
+        # Columnar Arrow conversion of the whole result instead of a dict() per Row. The result is one row
+        # per keyword, so the plain REST download is kept (no Storage Read API client/channel needed).
+        records = self.client.query(sql, job_config=_CACHED_QUERY_CONFIG).result().to_arrow(create_bqstorage_client=False).to_pylist()
+        for record in records:
+            record["category"] = VIABILITY_CATEGORIES[record.pop("category_code")]
+        return records
+
+@lru_cache(maxsize=1)
+def get_bigquery_client() -> BigQueryClient:
+    """Process-wide BigQueryClient; the underlying bigquery.Client is thread-safe and shared by all requests."""
+    return BigQueryClient()
@@ -1,16 +1,21 @@
 
 import os
 import sys
-import json
+import asyncio
+import orjson
 import re
+import statistics
 from typing import Optional, Tuple, Dict, Any, List
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
 from fastapi.params import Query
 import firebase_admin
 from firebase_admin import firestore
+from firebase_admin import firestore_async
 from firebase_admin import credentials
+from core.ttl_cache import LRUCache
 
 def initialize_firebase():
     if not firebase_admin._apps:
@@ -21,7 +26,7 @@ def initialize_firebase():
         
         try:
             if firebase_creds:
-                cred_dict = json.loads(firebase_creds)
+                cred_dict = orjson.loads(firebase_creds)
                 project_id = cred_dict.get("project_id", project_id)
                 cred = credentials.Certificate(cred_dict)
                 firebase_admin.initialize_app(cred, options={
@@ -33,8 +38,9 @@ def initialize_firebase():
         except Exception as e:
             print(f"⚠️ Warning: Env variable Firebase init failed: {e}")
 
-        # Check for service account key in various common locations
-        possible_keys = [
+        # An explicit key path skips probing the filesystem; otherwise check the common locations
+        explicit_key = os.environ.get("FIREBASE_CREDENTIALS_PATH")
+        possible_keys = [Path(explicit_key)] if explicit_key else [
             Path(__file__).parent.parent / "firebase-credentials.json",
             Path("firebase-credentials.json"),
             Path(__file__).parent.parent / "service-account.json",  
@@ -42,20 +48,25 @@ def initialize_firebase():
         ]
         
         cred_path = None
+        cred_data = None
         for path in possible_keys:
-            if path.exists():
-                cred_path = str(path)
-                try:
-                    with open(path) as f:
-                        cred_data = json.load(f)
-                        project_id = cred_data.get("project_id", project_id)
-                except Exception:
-                    pass
-                break
+            try:
+                # Read directly instead of exists() + open(): one filesystem call per candidate
+                key_bytes = path.read_bytes()
+            except OSError:
+                continue
+            cred_path = str(path)
+            try:
+                cred_data = orjson.loads(key_bytes)
+                project_id = cred_data.get("project_id", project_id)
+            except Exception:
+                cred_data = None
+            break
         
         try:
             if cred_path:
-                cred = credentials.Certificate(cred_path)
+                # The already-parsed key is reused rather than having Certificate re-read the file
+                cred = credentials.Certificate(cred_data if cred_data is not None else cred_path)
                 firebase_admin.initialize_app(cred, options={
                     'projectId': project_id,
                     'storageBucket': f"{project_id}.firebasestorage.app"
@@ -73,9 +84,29 @@ def initialize_firebase():
 
 initialize_firebase()
 
+# The leaderboard scans every user document; the ranked result is shared across requests for this long
+LEADERBOARD_CACHE_TTL = int(os.getenv("LEADERBOARD_CACHE_TTL", "60"))
+_LEADERBOARD_CACHE = LRUCache(max_size=8, ttl=LEADERBOARD_CACHE_TTL)
+
+# Counters that make up a user's leaderboard score. Their sum is also stored as stats.score (kept in step by
+# increment_user_stat) so the leaderboard can be read through Firestore's index with order_by + limit.
+LEADERBOARD_SCORE_STATS = ('roadmaps_generated', 'resumes_optimized', 'assessments_taken', 'jobs_matched')
+
+def _leaderboard_score(stats: Dict[str, Any]) -> int:
+    return sum(stats.get(stat, 0) for stat in LEADERBOARD_SCORE_STATS)
+
+_DESCENDING = firestore.Query.DESCENDING
+
+# Firestore's cap on writes in one batched commit
+FIRESTORE_BATCH_LIMIT = 500
+
+# Attempts per write before a BulkWriter gives up on it (matches the SDK's default retry policy)
+BULK_WRITE_MAX_ATTEMPTS = 15
+
 def _stringify_list_content(content: Any) -> str:
     """Safely converts a list of strings or dicts into a single newline-separated string."""
     if not isinstance(content, list): return str(content or "")
+    if all(type(item) is str for item in content): return "\n".join(content) # Plain bullet list, the usual case
     string_parts = []
     for item in content:
         if isinstance(item, str): string_parts.append(item)
@@ -89,46 +120,75 @@ def calculate_stats(numbers):
     """Calculates mean and median for a list of numbers."""
     if not numbers:
         return {"mean": 0, "median": 0}
-        
-    numbers = sorted(numbers)
-    n = len(numbers)
-    mean = sum(numbers) / n
-
-    if n % 2 == 1:
-        median = numbers[n // 2]
-    else:
-        median = (numbers[n // 2 - 1] + numbers[n // 2]) / 2
 
     return {
-        "mean": mean,
-        "median": median
+        "mean": statistics.fmean(numbers),
+        "median": statistics.median(numbers)
     }
 
+# Exact-type dispatch for _convert_firestore_timestamps. JSON-ready leaves are returned as-is; other leaf
+# types map to a converter, learned (and cached here) the first time a type is seen.
+_JSON_LEAF_TYPES = frozenset((str, int, float, bool, type(None)))
+_LEAF_CONVERTERS: Dict[type, Any] = {datetime: datetime.isoformat}
+
+def _leaf_converter(obj_type: type):
+    converter = _LEAF_CONVERTERS.get(obj_type)
+    if converter is None:
+        if issubclass(obj_type, datetime): # Includes Firestore's DatetimeWithNanoseconds
+            converter = lambda value: value.isoformat() # Honours a subclass's own isoformat()
+        elif 'Sentinel' in obj_type.__name__: # e.g. SERVER_TIMESTAMP
+            converter = lambda _: datetime.now().isoformat()
+        else:
+            converter = lambda value: value
+        _LEAF_CONVERTERS[obj_type] = converter
+    return converter
+
+def _container_type(obj_type: type) -> Optional[type]:
+    if obj_type is dict or obj_type is list:
+        return obj_type
+    if issubclass(obj_type, dict):
+        return dict
+    if issubclass(obj_type, list):
+        return list
+    return None
+
 def _convert_firestore_timestamps(obj: Any) -> Any:
     """
-    Recursively converts Firestore DatetimeWithNanoseconds objects (and standard datetime objects)
-    to ISO 8601 strings to make them JSON serializable.
+    Converts Firestore DatetimeWithNanoseconds objects (and standard datetime objects) anywhere in a
+    nested structure to ISO 8601 strings to make them JSON serializable.
     Also handles Firestore 'Sentinel' objects (like SERVER_TIMESTAMP) by converting to current time.
+    Walks dicts/lists with an explicit stack rather than recursion, filling pre-built output containers;
+    a container reached more than once (shared sub-tree) is converted once.
     """
-    if isinstance(obj, dict):
-        return {k: _convert_firestore_timestamps(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [_convert_firestore_timestamps(elem) for elem in obj]
-    elif isinstance(obj, datetime):
-        return obj.isoformat()
-    
-    # Handle Firestore Sentinel objects or other non-serializable types
-    if not isinstance(obj, (str, int, float, bool, type(None))):
-        try:
-            name = type(obj).__name__
-            if 'Sentinel' in name:
-                return datetime.now().isoformat()
-            if 'DatetimeWithNanoseconds' in name:
-                return obj.isoformat()
-        except:
-            pass
-    return obj
-
+    obj_type = type(obj)
+    if obj_type in _JSON_LEAF_TYPES:
+        return obj
+    root_type = _container_type(obj_type)
+    if root_type is None:
+        return _leaf_converter(obj_type)(obj)
+
+    converted: Dict[int, Any] = {}
+    root = {} if root_type is dict else [None] * len(obj)
+    converted[id(obj)] = root
+    stack = [(obj, root)]
+    while stack:
+        source, target = stack.pop()
+        for key, value in (source.items() if isinstance(target, dict) else enumerate(source)):
+            value_type = type(value)
+            if value_type in _JSON_LEAF_TYPES:
+                target[key] = value
+                continue
+            child_type = _container_type(value_type)
+            if child_type is None:
+                target[key] = _leaf_converter(value_type)(value)
+                continue
+            child = converted.get(id(value))
+            if child is None:
+                child = {} if child_type is dict else [None] * len(value)
+                converted[id(value)] = child
+                stack.append((value, child))
+            target[key] = child
+    return root
 
 class DatabaseManager:
     """
@@ -145,6 +205,14 @@ class DatabaseManager:
         'skills': 'skills',
         'additional_sections': 'additional_sections'
     }
+    _ADDITIONAL_SECTIONS_COLLECTION = _standard_to_db_collections_map['additional_sections']
+
+    # Sub-collections whose documents are only read for a fixed set of fields: fetched with a projection.
+    # Item collections (work_experiences, projects...) are returned whole, so they keep every field.
+    _collection_read_fields = {
+        'skills': ['category', 'skill_name'],
+        'additional_sections': ['section_name', 'description', 'optimized_description'],
+    }
 
     _ai_key_to_standard_map = {
         'personal_info': ['personal_info'],
@@ -156,6 +224,9 @@ class DatabaseManager:
         'certifications': ['certifications', 'licenses_&_certifications'],
         'skills': ['skills'],
     }
+    # Reverse of the map above, built once: variant -> standard key
+    _ai_variant_to_standard = {variant: standard_key for standard_key, variants in _ai_key_to_standard_map.items() for variant in variants}
+    _AI_KEY_NORMALIZATION = str.maketrans({' ': '_', '-': '_'})
 
     def __init__(self):
         """
@@ -164,19 +235,60 @@ class DatabaseManager:
         """
         try:
             self.db = firestore.client()
+            # Native asyncio client for the reads/writes on async request paths: awaiting it doesn't tie up
+            # a worker thread per in-flight RPC the way the sync client wrapped in to_thread does
+            self.adb = firestore_async.client()
         except Exception as e:
             print(f"❌ ERROR: DatabaseManager failed to get Firestore client. Is Firebase Admin SDK initialized? {e}")
             raise 
 
     def _map_ai_section_to_standard_key(self, ai_key: str) -> Optional[str]:
-        normalized_key = ai_key.lower().replace(" ", "_").replace("-", "_")
-        for standard_key, variations in self._ai_key_to_standard_map.items():
-            if normalized_key in variations: return standard_key
-        return None
+        return self._ai_variant_to_standard.get(ai_key.lower().translate(self._AI_KEY_NORMALIZATION))
     
-    def fetch_resume_relational(self, user_uid: str, get_optimized: bool = False) -> Optional[Dict[str, Any]]:
-        user_doc_ref = self.db.collection('users').document(user_uid)
-        user_doc = user_doc_ref.get()
+    def _bulk_writer(self):
+        """
+        Returns a BulkWriter (up to 500 mutations per commit RPC) plus the list its permanently failed
+        writes are collected into; the SDK only logs those, so callers check the list after close().
+        """
+        bulk_writer = self.db.bulk_writer()
+        failed_writes = []
+
+        def on_write_error(error) -> bool:
+            if error.attempts < BULK_WRITE_MAX_ATTEMPTS:
+                return True # Retry with backoff
+            failed_writes.append(error)
+            return False
+
+        bulk_writer.on_write_error(on_write_error)
+        return bulk_writer, failed_writes
+
+    async def fetch_resume_relational(self, user_uid: str, get_optimized: bool = False) -> Optional[Dict[str, Any]]:
+        user_doc_ref = self.adb.collection('users').document(user_uid)
+        collection_names = list(self._standard_to_db_collections_map.values())
+
+        async def read_collection(name):
+            query = user_doc_ref.collection(name)
+            read_fields = self._collection_read_fields.get(name)
+            if read_fields:
+                if not get_optimized:
+                    read_fields = [field for field in read_fields if field != 'optimized_description']
+                query = query.select(read_fields)
+            return [doc async for doc in query.stream()]
+
+        async def read_collections(names):
+            docs = await asyncio.gather(*(read_collection(name) for name in names))
+            return dict(zip(names, docs))
+
+        if get_optimized:
+            # Optimized descriptions only live in the sub-collections, so all of them are needed: read them
+            # concurrently with the user doc so the total wait is the slowest RPC rather than the sum of all eight
+            user_doc, docs_by_collection = await asyncio.gather(
+                user_doc_ref.get(), read_collections(collection_names)
+            )
+        else:
+            # Which sub-collections are needed depends on the user doc (see below)
+            user_doc = await user_doc_ref.get()
+            docs_by_collection = None
 
         if not user_doc.exists:
             print(f"User document with UID {user_uid} not found.")
@@ -197,7 +309,7 @@ class DatabaseManager:
             'linkedin': user_data.get('linkedin'),
             'github': user_data.get('github')
         }
-        if any(v for v in personal_info.values() if v is not None and v != ''):
+        if any(personal_info.values()):
             resume_data['personal_info'] = personal_info
 
         # Fetch the stored raw text and metadata
@@ -237,6 +349,19 @@ class DatabaseManager:
             resume_data['summary'] = summary_to_use
 
 
+        if docs_by_collection is None:
+            # structured_resume_data holds the same items (custom sections included, under their own names)
+            # as the sub-collections, minus the optimized descriptions this view doesn't use; only read
+            # the collections for sections it lacks. Users saved before it existed need all of them.
+            needed = collection_names
+            if structured_resume_data:
+                needed = [
+                    collection_name for standard_key, collection_name in self._standard_to_db_collections_map.items()
+                    if standard_key != 'additional_sections' and standard_key not in resume_data
+                ]
+            docs_by_collection = dict.fromkeys(collection_names, [])
+            docs_by_collection.update(await read_collections(needed))
+
         # --- Fetch sub-collection data ---
         # This part ensures that if structured_resume_data (above) didn't fully capture
         # all sub-collection details (e.g., if you only store a summary of projects there),
@@ -247,7 +372,7 @@ class DatabaseManager:
             if standard_key in ['skills', 'additional_sections']:
                 continue 
             
-            docs = user_doc_ref.collection(collection_name).stream()
+            docs = docs_by_collection[collection_name]
             data_list = []
             for doc in docs:
                 item_data = doc.to_dict()
@@ -262,7 +387,7 @@ class DatabaseManager:
                 item = {k: v for k, v in item_data.items() if k not in ['optimized_description', 'description']}
                 
                 if desc_to_use:
-                    item['description'] = desc_to_use.split('\n') if isinstance(desc_to_use, str) else desc_to_use
+                    item['description'] = desc_to_use.splitlines() if isinstance(desc_to_use, str) else desc_to_use
                 
                 data_list.append(item)
             if data_list:
@@ -271,7 +396,7 @@ class DatabaseManager:
         # Skills (explicitly fetched from sub-collection even if top-level exists, for optimized_data view)
         # Note: This will override any 'skills' key from structured_resume_data fetched earlier if present.
         # This prioritizes the detailed sub-collection for the optimized view.
-        docs = user_doc_ref.collection(self._standard_to_db_collections_map['skills']).stream()
+        docs = docs_by_collection[self._standard_to_db_collections_map['skills']]
         skills_dict: Dict[str, Any] = {}
         for doc in docs:
             item = doc.to_dict()
@@ -286,7 +411,7 @@ class DatabaseManager:
             resume_data['skills'] = skills_dict;
 
         # Additional sections
-        docs = user_doc_ref.collection(self._standard_to_db_collections_map['additional_sections']).stream()
+        docs = docs_by_collection[self._ADDITIONAL_SECTIONS_COLLECTION]
         for doc in docs:
             item = doc.to_dict()
             item = _convert_firestore_timestamps(item) # Apply conversion
@@ -297,9 +422,10 @@ class DatabaseManager:
             )
             section_name = item.get('section_name')
             if section_name and desc_to_use:
-                resume_data[section_name] = desc_to_use.split('\n') if isinstance(desc_to_use, str) else desc_to_use
+                resume_data[section_name] = desc_to_use.splitlines() if isinstance(desc_to_use, str) else desc_to_use
 
-        return _convert_firestore_timestamps({k: v for k, v in resume_data.items() if v})
+        # Every value above came from user_data or a sub-collection item that was already converted
+        return {k: v for k, v in resume_data.items() if v}
 
     def update_resume_relational(self, user_uid: str, parsed_data: Dict[str, Any]) -> bool:
         """
@@ -308,16 +434,18 @@ class DatabaseManager:
         """
         try:
             user_doc_ref = self.db.collection('users').document(user_uid)
-            
-            user_doc_ref.set({'lastUpdatedAt': firestore.SERVER_TIMESTAMP}, merge=True)
-            print(f" -> Ensured user document exists for {user_uid}")
+            # Deletes, the user doc write and re-inserts are all queued here and committed in batches
+            bulk_writer, failed_writes = self._bulk_writer()
 
             collections_to_delete = list(self._standard_to_db_collections_map.values())
-            for coll_name in collections_to_delete:
-                docs = user_doc_ref.collection(coll_name).stream()
-                for doc in docs:
-                    doc.reference.delete()
-            print(f" -> Cleared old resume sub-collections for user {user_uid}")
+            # list_documents() yields references only, so the old items' contents are never downloaded.
+            # The per-collection listings are independent RPCs and run in parallel; the BulkWriter
+            # already commits the deletes themselves concurrently.
+            with ThreadPoolExecutor(max_workers=len(collections_to_delete)) as executor:
+                listings = executor.map(lambda coll_name: list(user_doc_ref.collection(coll_name).list_documents()), collections_to_delete)
+                for doc_refs in listings:
+                    for doc_ref in doc_refs:
+                        bulk_writer.delete(doc_ref)
 
             p_info = parsed_data.get('personal_info', {})
             
@@ -340,8 +468,13 @@ class DatabaseManager:
             if 'resume' in filtered_update_fields and isinstance(filtered_update_fields['resume'], dict):
                 filtered_update_fields['resume'] = {k: v for k, v in filtered_update_fields['resume'].items() if v is not None}
             
-            user_doc_ref.update(filtered_update_fields)
-            print(f" -> Updated main user document for {user_uid} with personal info, raw text, metadata, structured data, and summary.")
+            # One merge-set instead of set() + update(): merging exactly these field paths replaces them like
+            # update() would, but also creates the user document if it doesn't exist yet
+            user_doc_data: Dict[str, Any] = {}
+            for field_path, value in filtered_update_fields.items():
+                parent, _, leaf = field_path.rpartition('.')
+                (user_doc_data.setdefault(parent, {}) if parent else user_doc_data)[leaf] = value
+            bulk_writer.set(user_doc_ref, user_doc_data, merge=list(filtered_update_fields))
 
             for ai_section_key, section_content in parsed_data.items():
                 if ai_section_key in ['personal_info', 'summary', 'skills', 'resume_metadata', 'raw_text', 'optimized_summary']:
@@ -358,17 +491,21 @@ class DatabaseManager:
                                 if 'description' in item_to_save:
                                     item_to_save['description'] = _stringify_list_content(item_to_save['description'])
                                 item_to_save['optimized_description'] = None
-                                user_doc_ref.collection(collection_name).add(item_to_save)
+                                bulk_writer.create(user_doc_ref.collection(collection_name).document(), item_to_save)
                 else: # For custom/additional sections
                     description = _stringify_list_content(section_content)
-                    user_doc_ref.collection(self._standard_to_db_collections_map['additional_sections']).add({
+                    bulk_writer.create(user_doc_ref.collection(self._ADDITIONAL_SECTIONS_COLLECTION).document(), {
                         'section_name': ai_section_key,
                         'description': description,
                         'optimized_description': None
                     })
             
+            bulk_writer.close() # Flushes everything queued above
+            if failed_writes:
+                print(f"Error updating resume for user {user_uid}: {len(failed_writes)} writes failed ({failed_writes[0].message})")
+                return False
 
-            print(f" -> Successfully re-inserted new resume sub-collection data for user {user_uid}.")
+            print(f" -> Successfully replaced resume data and sub-collections for user {user_uid}.")
             return True
 
         except Exception as e:
@@ -376,42 +513,57 @@ class DatabaseManager:
             return False
 
 
-    def update_optimized_resume_relational(self, user_uid: str, optimized_data: Dict[str, Any]):
-        user_doc_ref = self.db.collection('users').document(user_uid)
+    async def update_optimized_resume_relational(self, user_uid: str, optimized_data: Dict[str, Any]):
+        user_doc_ref = self.adb.collection('users').document(user_uid)
+        updates = [] # (ref, fields), committed together at the end
+        user_doc_fields: Dict[str, Any] = {'lastUpdatedAt': firestore.SERVER_TIMESTAMP}
 
         # Update the summary field in the top-level structured_resume_data
         if 'summary' in optimized_data:
-            user_doc_ref.update({'structured_resume_data.summary': optimized_data['summary']})
-            user_doc_ref.update({'structured_resume_data.optimized_summary': optimized_data['summary']}) # Store optimized summary directly
+            user_doc_fields['structured_resume_data.summary'] = optimized_data['summary']
+            user_doc_fields['structured_resume_data.optimized_summary'] = optimized_data['summary'] # Store optimized summary directly
 
         # This part iterates sub-collections and updates 'optimized_description'
-        def update_item_optimized_description(collection_name: str, items: list, match_keys: list):
+        async def update_item_optimized_description(collection_name: str, items: list, match_keys: list):
+            # One read of the (small) sub-collection, matched in memory, instead of a filtered query per item
+            docs = [(doc.reference, doc.to_dict()) async for doc in user_doc_ref.collection(collection_name).stream()]
             for item_to_match in items:
                 optimized_desc_str = _stringify_list_content(item_to_match.get('description', []))
                 
-                query = user_doc_ref.collection(collection_name)
-                for key in match_keys:
-                    if item_to_match.get(key):
-                        query = query.where(key, '==', item_to_match.get(key))
-                
-                docs = query.limit(1).stream()
-                for doc in docs:
-                    doc.reference.update({'optimized_description': optimized_desc_str})
-
-        if 'work_experience' in optimized_data: update_item_optimized_description(self._standard_to_db_collections_map['work_experience'], optimized_data['work_experience'], ['role', 'company'])
-        if 'education' in optimized_data: update_item_optimized_description(self._standard_to_db_collections_map['education'], optimized_data['education'], ['institution', 'degree'])
-        if 'projects' in optimized_data: update_item_optimized_description(self._standard_to_db_collections_map['projects'], optimized_data['projects'], ['title'])
-        if 'internships' in optimized_data: update_item_optimized_description(self._standard_to_db_collections_map['internships'], optimized_data['internships'], ['role', 'company'])
-        if 'certifications' in optimized_data: update_item_optimized_description(self._standard_to_db_collections_map['certifications'], optimized_data['certifications'], ['name'])
-
+                # Same match as the old where(...).limit(1) query: first doc equal on every key the item has a value for
+                match_fields = {key: item_to_match.get(key) for key in match_keys if item_to_match.get(key)}
+                doc_ref = next((ref for ref, data in docs if all(data.get(k) == v for k, v in match_fields.items())), None)
+                if doc_ref is not None:
+                    updates.append((doc_ref, {'optimized_description': optimized_desc_str}))
+
+        if 'work_experience' in optimized_data: await update_item_optimized_description(self._standard_to_db_collections_map['work_experience'], optimized_data['work_experience'], ['role', 'company'])
+        if 'education' in optimized_data: await update_item_optimized_description(self._standard_to_db_collections_map['education'], optimized_data['education'], ['institution', 'degree'])
+        if 'projects' in optimized_data: await update_item_optimized_description(self._standard_to_db_collections_map['projects'], optimized_data['projects'], ['title'])
+        if 'internships' in optimized_data: await update_item_optimized_description(self._standard_to_db_collections_map['internships'], optimized_data['internships'], ['role', 'company'])
+        if 'certifications' in optimized_data: await update_item_optimized_description(self._standard_to_db_collections_map['certifications'], optimized_data['certifications'], ['name'])
+
+        additional_section_refs: Optional[Dict[str, Any]] = None
         for key, content in optimized_data.items():
             if self._map_ai_section_to_standard_key(key) is None and key not in ['personal_info', 'summary', 'skills', 'resume_metadata', 'raw_text', 'structured_resume_data', 'categorized_skills', 'optimized_summary']:
+                if additional_section_refs is None:
+                    additional_section_refs = {}
+                    async for doc in user_doc_ref.collection(self._ADDITIONAL_SECTIONS_COLLECTION).stream():
+                        # DocumentSnapshot.get raises KeyError on a missing field; skip docs without a name
+                        section_name = (doc.to_dict() or {}).get('section_name')
+                        if section_name is not None:
+                            additional_section_refs.setdefault(section_name, doc.reference)
                 optimized_desc_str = _stringify_list_content(content)
-                docs = user_doc_ref.collection(self._standard_to_db_collections_map['additional_sections']).where('section_name', '==', key).limit(1).stream()
-                for doc in docs:
-                    doc.reference.update({'optimized_description': optimized_desc_str})
+                if key in additional_section_refs:
+                    updates.append((additional_section_refs[key], {'optimized_description': optimized_desc_str}))
         
-        user_doc_ref.update({'lastUpdatedAt': firestore.SERVER_TIMESTAMP})
+        updates.append((user_doc_ref, user_doc_fields))
+        # A single atomic WriteBatch commit (a resume is far below the 500-write cap), so a failure leaves
+        # the previous optimized version intact instead of a half-applied one
+        for start in range(0, len(updates), FIRESTORE_BATCH_LIMIT):
+            batch = self.adb.batch()
+            for ref, fields in updates[start:start + FIRESTORE_BATCH_LIMIT]:
+                batch.update(ref, fields)
+            await batch.commit()
         print(f" -> Optimized data for user UID {user_uid} has been fully updated in Firestore.")
 
 
@@ -420,134 +572,127 @@ class DatabaseManager:
         """
         Fetches users and sorts them by a calculated 'activity score'.
         Score = roadmaps + resumes + assessments + jobs_matched.
+        Results are cached per `limit` for LEADERBOARD_CACHE_TTL seconds.
         """
+        cached = _LEADERBOARD_CACHE.get(limit)
+        if cached is not None:
+            return cached
         try:
             users_ref = self.db.collection('users')
-            # Fetch all users but ONLY necessary fields to keep it lightweight
+            # Fetch ONLY necessary fields to keep it lightweight
             # This drastically reduces bandwidth by ignoring large 'resume_text' fields
-            docs = users_ref.select(['name', 'email', 'stats', 'categorized_skills', 'linkedin', 'github']).stream()
-            
+            fields = ['name', 'email', 'stats', 'categorized_skills', 'linkedin', 'github']
+            # Top scores straight from the stats.score index, already in rank order: `limit` documents read.
+            # Every user carries stats.score (seeded to 0 at signup, backfill_leaderboard_scores.py for older
+            # users), since documents without the ordered field are left out of the query.
+            docs = users_ref.select(fields).order_by('stats.score', direction=_DESCENDING).limit(limit).stream()
+
             leaderboard_data = []
             for doc in docs:
                 data = doc.to_dict()
                 stats = data.get('stats', {})
-                
-                # Calculate Total Score
-                score = (
-                    stats.get('roadmaps_generated', 0) +
-                    stats.get('resumes_optimized', 0) +
-                    stats.get('assessments_taken', 0) +
-                    stats.get('jobs_matched', 0)
-                )
-                
-                # Only include users with some activity
-                if score >= 0: 
-                    user_info = {
-                        "name": data.get('name', 'Anonymous User'),
-                        "email": data.get('email', 'Hidden'),
-                        "linkedin": data.get('linkedin'),
-                        "github": data.get('github'),
-                        "skills": data.get('categorized_skills', {}), 
-                        "score": score,
-                        "stats": stats
-                    }
-                    leaderboard_data.append(user_info)
-            
-            # Sort by score descending (Highest first)
-            leaderboard_data.sort(key=lambda x: x['score'], reverse=True)
+                leaderboard_data.append({
+                    "name": data.get('name', 'Anonymous User'),
+                    "email": data.get('email', 'Hidden'),
+                    "linkedin": data.get('linkedin'),
+                    "github": data.get('github'),
+                    "skills": data.get('categorized_skills', {}), 
+                    "score": _leaderboard_score(stats),
+                    "stats": stats
+                })
             
-            return _convert_firestore_timestamps(leaderboard_data[:limit])
+            leaderboard = _convert_firestore_timestamps(leaderboard_data)
+            _LEADERBOARD_CACHE.set(limit, leaderboard)
+            return leaderboard
             
         except Exception as e:
             print(f"❌ Error fetching leaderboard: {e}")
             return []
+
+    def backfill_leaderboard_scores(self) -> int:
+        """
+        One-off migration: writes stats.score for every user where it is missing or stale, so users whose
+        stats predate the stored score show up in the leaderboard index. Returns the number of users written.
+        """
+        bulk_writer, failed_writes = self._bulk_writer()
+        backfilled = 0
+        for doc in self.db.collection('users').select(['stats']).stream():
+            stats = doc.to_dict().get('stats')
+            if stats is not None and not isinstance(stats, dict):
+                continue # Malformed stats map; left as is
+            stats = stats or {}
+            score = _leaderboard_score(stats)
+            if stats.get('score') != score:
+                bulk_writer.update(doc.reference, {'stats.score': score})
+                backfilled += 1
+        bulk_writer.close()
+        print(f"ℹ️ Backfilled leaderboard score for {backfilled - len(failed_writes)} of {backfilled} users.")
+        return backfilled - len(failed_writes)
         
     def close_connection(self):
         pass
 
 
     # NEW/MODIFIED: Function to safely increment user statistics
-    def increment_user_stat(self, uid: str, stat_name: str, increment_by: int = 1):
-        user_doc_ref = self.db.collection('users').document(uid)
+    async def increment_user_stat(self, uid: str, stat_name: str, increment_by: int = 1):
+        user_doc_ref = self.adb.collection('users').document(uid)
+        score_increment = increment_by if stat_name in LEADERBOARD_SCORE_STATS else 0
         try:
-            # Check if 'stats' map exists and is a dictionary
-            user_doc = user_doc_ref.get()
-            if not user_doc.exists:
-                # If document doesn't exist, create it with initial stats
-                print(f"ℹ️ User document for {uid} does not exist. Creating with initial stats.")
-                user_doc_ref.set({
-                    'stats': {
-                        'roadmaps_generated': 0,
-                        'resumes_optimized': 0,
-                        'assessments_taken': 0,
-                        'jobs_matched': 0,
-                        stat_name: firestore.Increment(increment_by) # Include current increment
-                    }
-                })
-            else:
-                user_data = user_doc.to_dict()
-                if 'stats' not in user_data or not isinstance(user_data['stats'], dict):
-                    # If 'stats' is missing or not a dict, initialize it safely
-                    print(f"ℹ️ 'stats' field missing or malformed for {uid}. Initializing and setting stat.")
-                    user_doc_ref.update({
-                        'stats': {
-                            'roadmaps_generated': 0,
-                            'resumes_optimized': 0,
-                            'assessments_taken': 0,
-                            'jobs_matched': 0,
-                            stat_name: firestore.Increment(increment_by) # Include current increment
-                        }
-                    })
-                else:
-                    # 'stats' map exists, proceed with incrementing the specific field
-                    user_doc_ref.update({
-                        f'stats.{stat_name}': firestore.Increment(increment_by)
-                    })
+            # A single merge-set, no read first: it creates the document and/or the stats map when missing,
+            # and otherwise only touches these two counters. Counters that were never incremented are
+            # simply absent and read as 0. The denormalized score moves in the same write; a score missing
+            # from older users is seeded by backfill_leaderboard_scores, not here.
+            await user_doc_ref.set({
+                'stats': {
+                    stat_name: firestore.Increment(increment_by),
+                    'score': firestore.Increment(score_increment)
+                }
+            }, merge=True)
             print(f"✅ Incremented stat '{stat_name}' for user {uid} by {increment_by}.")
         except Exception as e:
             print(f"❌ Critical Error incrementing stat '{stat_name}' for user {uid}: {e}")
             raise # Re-raise to ensure error is propagated
 
     # NEW: Helper methods to call increment_user_stat for specific actions
-    def record_resume_optimization(self, uid: str):
-        self.increment_user_stat(uid, 'resumes_optimized', 1)
+    async def record_resume_optimization(self, uid: str):
+        await self.increment_user_stat(uid, 'resumes_optimized', 1)
 
-    def record_roadmap_generation(self, uid: str):
-        self.increment_user_stat(uid, 'roadmaps_generated', 1)
+    async def record_roadmap_generation(self, uid: str):
+        await self.increment_user_stat(uid, 'roadmaps_generated', 1)
 
-    def record_assessment_taken(self, uid: str):
-        self.increment_user_stat(uid, 'assessments_taken', 1)
+    async def record_assessment_taken(self, uid: str):
+        await self.increment_user_stat(uid, 'assessments_taken', 1)
 
-    def record_jobs_matched(self, uid: str, num_jobs: int = 1):
-        self.increment_user_stat(uid, 'jobs_matched', num_jobs)
+    async def record_jobs_matched(self, uid: str, num_jobs: int = 1):
+        await self.increment_user_stat(uid, 'jobs_matched', num_jobs)
 
     # --- NEW: Performance Tracking Methods ---
 
-    def save_assessment_result(self, uid: str, results: Dict[str, Any]):
+    async def save_assessment_result(self, uid: str, results: Dict[str, Any]):
         """Saves a detailed assessment result to the user's assessments collection."""
         try:
             # Create a copy so we don't pollute the original dict with Firestore objects
             db_data = results.copy()
             db_data['timestamp'] = firestore.SERVER_TIMESTAMP
-            self.db.collection('users').document(uid).collection('assessments').add(db_data)
-            self.increment_user_stat(uid, 'assessments_taken')
+            await self.adb.collection('users').document(uid).collection('assessments').add(db_data)
+            await self.increment_user_stat(uid, 'assessments_taken')
             print(f"✅ Assessment result saved for user {uid}.")
         except Exception as e:
             print(f"❌ Error saving assessment result for {uid}: {e}")
 
-    def save_interview_result(self, uid: str, results: Dict[str, Any]):
+    async def save_interview_result(self, uid: str, results: Dict[str, Any]):
         """Saves a detailed interview result to the user's interviews collection."""
         try:
             # Create a copy so we don't pollute the original dict with Firestore objects
             db_data = results.copy()
             db_data['timestamp'] = firestore.SERVER_TIMESTAMP
-            self.db.collection('users').document(uid).collection('interviews').add(db_data)
-            self.increment_user_stat(uid, 'interviews_taken')
+            await self.adb.collection('users').document(uid).collection('interviews').add(db_data)
+            await self.increment_user_stat(uid, 'interviews_taken')
             print(f"✅ Interview result saved for user {uid}.")
         except Exception as e:
             print(f"❌ Error saving interview result for {uid}: {e}")
 
-    def save_ats_score_history(self, uid: str, score: int, job_role: str):
+    async def save_ats_score_history(self, uid: str, score: int, job_role: str):
         """Saves an ATS optimization score to the user's history."""
         try:
             data = {
@@ -555,7 +700,7 @@ class DatabaseManager:
                 'job_role': job_role,
                 'timestamp': firestore.SERVER_TIMESTAMP
             }
-            self.db.collection('users').document(uid).collection('ats_history').add(data)
+            await self.adb.collection('users').document(uid).collection('ats_history').add(data)
             print(f"✅ ATS score ({score}) saved for user {uid}.")
         except Exception as e:
             print(f"❌ Error saving ATS score for {uid}: {e}")
@@ -567,7 +712,7 @@ class DatabaseManager:
         Also calculates roadmap completion rate.
         """
         try:
-            user_ref = self.db.collection('users').document(uid)
+            user_ref = self.adb.collection('users').document(uid)
             
             # Helper to get score with fallbacks from different possible AI response field names
             def get_score(data, primary_key='overall_score', fallback_keys=['score', 'rating', 'percentage', 'grade']):
@@ -579,13 +724,21 @@ class DatabaseManager:
                     if val is not None and isinstance(val, (int, float)): return val
                 return 0
 
-            # 1. Assessments - Fetch Top 6 (extra one to check for more) using Query
+            # Top 6 (extra one to check for more) of each history collection, newest first.
             # We use 'limit(6)' to fetch just what we need.
-            assessments_ref = user_ref.collection('assessments')
-            # Order by timestamp descending
-            query = assessments_ref.order_by('timestamp', direction=firestore.Query.DESCENDING).limit(6)
-            assessments_list = [doc.to_dict() for doc in query.stream()]
-            
+            async def fetch_recent(collection_name):
+                query = user_ref.collection(collection_name).order_by('timestamp', direction=_DESCENDING).limit(6)
+                return [doc.to_dict() async for doc in query.stream()]
+
+            # The three history queries and the roadmap read are independent: run them concurrently
+            assessments_list, interviews_list, ats_list, roadmap = await asyncio.gather(
+                fetch_recent('assessments'),
+                fetch_recent('interviews'),
+                fetch_recent('ats_history'),
+                self.get_user_roadmap(uid)
+            )
+
+            # 1. Assessments
             # If for some reason timestamp is missing, our order_by might drop them.
             # But we save timestamp on creation, so this should remain robust for new data.
             # Fallback sort in python just in case some docs were returned out of order or if we want to be safe
@@ -605,11 +758,7 @@ class DatabaseManager:
                     'timestamp': data.get('timestamp')
                 })
 
-            # 2. Interviews - Fetch Top 6
-            interviews_ref = user_ref.collection('interviews')
-            query = interviews_ref.order_by('timestamp', direction=firestore.Query.DESCENDING).limit(6)
-            interviews_list = [doc.to_dict() for doc in query.stream()]
-            
+            # 2. Interviews
             interviews_list.sort(key=lambda x: str(x.get('timestamp', '0')), reverse=True)
             
             interview_scores = [get_score(data) for data in interviews_list[:5]]
@@ -626,11 +775,7 @@ class DatabaseManager:
                     'timestamp': data.get('timestamp')
                 })
 
-            # 3. Latest ATS Score and History - Fetch Top 6
-            ats_ref = user_ref.collection('ats_history')
-            query = ats_ref.order_by('timestamp', direction=firestore.Query.DESCENDING).limit(6)
-            ats_list = [doc.to_dict() for doc in query.stream()]
-            
+            # 3. Latest ATS Score and History
             ats_list.sort(key=lambda x: str(x.get('timestamp', '0')), reverse=True)
             
             latest_ats = get_score(ats_list[0], primary_key='score') if ats_list else 0
@@ -645,8 +790,7 @@ class DatabaseManager:
                     'timestamp': data.get('timestamp')
                 })
 
-            
-            roadmap = await self.get_user_roadmap(uid)
+
             completion_rate = 0
             total_tasks = 0
             completed_tasks = 0
@@ -759,10 +903,10 @@ class DatabaseManager:
     async def get_user_roadmap(self, user_uid: str) -> Optional[Dict[str, Any]]:
         """Retrieves the single roadmap document for a user."""
         try:
-            roadmaps_collection = self.db.collection('users').document(user_uid).collection('roadmaps')
+            roadmaps_collection = self.adb.collection('users').document(user_uid).collection('roadmaps')
             # Since there's only one, we can just get the first result from the stream.
-            docs = roadmaps_collection.limit(1).stream()
-            the_only_roadmap_doc = next(docs, None)
+            docs = [doc async for doc in roadmaps_collection.limit(1).stream()]
+            the_only_roadmap_doc = docs[0] if docs else None
 
             if the_only_roadmap_doc:
                 return _convert_firestore_timestamps(the_only_roadmap_doc.to_dict())
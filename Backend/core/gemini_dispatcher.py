@@ -0,0 +1,45 @@
+import os
+import asyncio
+from typing import Any, Callable, List, Optional
+
+# Backend/core/gemini_dispatcher.py
+
+# Process-wide cap on in-flight Gemini calls, shared by every request (keeps us inside per-key rate limits)
+GEMINI_CONCURRENCY = int(os.getenv("GEMINI_CONCURRENCY", "8"))
+
+class GeminiDispatcher:
+    """
+    Runs Gemini calls from async code: each prompt is sent as soon as a slot is free, in a worker thread
+    (the SDK is synchronous), under one process-wide concurrency limit.
+    The Gemini SDK has no synchronous multi-prompt endpoint, so prompts are never held back to be combined;
+    `submit_many` just issues them concurrently.
+    """
+
+    __slots__ = ("_call", "concurrency", "_semaphore", "_loop")
+
+    def __init__(self, call: Callable[..., Optional[Any]], concurrency: int = GEMINI_CONCURRENCY):
+        self._call = call
+        self.concurrency = concurrency
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # The semaphore is bound to the running loop; rebuild it if the loop changed
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._loop = loop
+        return self._semaphore
+
+    async def submit(self, prompt: str, **kwargs) -> Optional[Any]:
+        """Runs `prompt` and returns its response (None if every key and the fallback failed)."""
+        try:
+            async with self._get_semaphore():
+                return await asyncio.to_thread(self._call, prompt, **kwargs)
+        except Exception as e:
+            print(f"⚠️ Gemini call failed: {e}")
+            return None
+
+    async def submit_many(self, prompts: List[str], **kwargs) -> List[Optional[Any]]:
+        """Submits several prompts at once and returns their responses in prompt order."""
+        return await asyncio.gather(*[self.submit(p, **kwargs) for p in prompts])
@@ -1,17 +1,50 @@
 import os
 import sys
 import google.generativeai as genai
+from google.ai import generativelanguage as glm
 from google.api_core import exceptions as google_exceptions
 from dotenv import load_dotenv
-from typing import Optional, Any, List
+from typing import Optional, Any, List, Dict, Tuple
 
 import time
+import threading
+from core.ttl_cache import LRUCache
 
 # Load env vars
 load_dotenv()
 
+SAFETY_SETTINGS = [
+    { "category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_NONE" },
+    { "category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_NONE" },
+    { "category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_NONE" },
+    { "category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_NONE" },
+]
+
+# Per-session system instructions (e.g. interview persona + JD) each get their own model, so the
+# model cache is bounded; an idle session's model is dropped after the TTL and rebuilt on demand.
+MODEL_CACHE_SIZE = int(os.getenv("GEMINI_MODEL_CACHE_SIZE", "128"))
+MODEL_CACHE_TTL = int(os.getenv("GEMINI_MODEL_CACHE_TTL", str(30 * 60)))
+
+class StreamedResponse:
+    """Text of a streamed generation, joined once after the last chunk arrives; mirrors the `.text` interface."""
+    __slots__ = ("text", "prompt_feedback")
+
+    def __init__(self, text: str, prompt_feedback: Any = None):
+        self.text = text
+        self.prompt_feedback = prompt_feedback
+
+def _consume_stream(response) -> StreamedResponse:
+    # Chunks are collected in a list and joined once (no quadratic string concatenation or re-parsing)
+    chunks = [chunk.text for chunk in response]
+    text = "".join(chunks)
+    tail = text.rstrip()[-1:]
+    if tail and tail not in "}]`":
+        print(f"⚠️ Streamed response ended without closing JSON (last char {tail!r}); it may be truncated.")
+    return StreamedResponse(text, getattr(response, "prompt_feedback", None))
+
 class GeminiHandler:
     _instance = None
+    __slots__ = ("api_keys", "current_index", "model_name", "circuit_open", "circuit_open_time", "circuit_breaker_timeout", "_models", "_clients", "_config_lock")
     
     def __new__(cls):
         if cls._instance is None:
@@ -34,10 +67,19 @@ class GeminiHandler:
         self.circuit_open_time = 0
         self.circuit_breaker_timeout = 3600 # 1 hour timeout (Keep fallback active for longer)
 
+        # One long-lived client (and therefore one transport/channel) per key, so repeated calls reuse the
+        # open connection instead of paying TCP+TLS setup every time. Each client carries its own key, so
+        # concurrent calls on different keys never go through the SDK's process-global genai.configure().
+        self._clients: Dict[str, Any] = {}
+        # Models keyed by (api key, system instruction): the static preamble is bound to the model once.
+        self._models = LRUCache(max_size=MODEL_CACHE_SIZE, ttl=MODEL_CACHE_TTL)
+        self._config_lock = threading.Lock()
+
         # 1. Try new comma-separated format
         keys_str = os.getenv("GEMINI_API_KEYS")
         if keys_str:
-            self.api_keys = [k.strip() for k in keys_str.split(',') if k.strip()]
+            # dict.fromkeys drops duplicate keys while keeping rotation order
+            self.api_keys = list(dict.fromkeys(k.strip() for k in keys_str.split(',') if k.strip()))
         
         # 2. Legacy Fallback (optional, for backward compatibility)
         if not self.api_keys:
@@ -50,7 +92,9 @@ class GeminiHandler:
         else:
             print("❌ No Gemini API keys found in .env")
 
-    def _call_groq_fallback(self, prompt, is_chat, history):
+    def _call_groq_fallback(self, prompt, is_chat, history, system_instruction=None):
+        if system_instruction:
+            prompt = f"{system_instruction}\n\n{prompt}" # Groq has no separate preamble slot here
         try:
             from core.groq_handler import groq_client
             print("🔄 Switching to Groq Llama-3...")
@@ -59,13 +103,36 @@ class GeminiHandler:
             print(f"❌ Fallback to Groq failed: {e}")
             return None
 
-    def call_gemini(self, prompt: str, image_data: str = None, is_chat: bool = False, history: List = None) -> Optional[Any]:
+    def _get_model(self, key: str, system_instruction: Optional[str] = None):
+        """Returns the cached model for `key`, bound to that key's own client."""
+        with self._config_lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = glm.GenerativeServiceClient(client_options={"api_key": key})
+                self._clients[key] = client
+            model = self._models.get((key, system_instruction))
+            if model is None:
+                model = genai.GenerativeModel(self.model_name, system_instruction=system_instruction)
+                # Bind the client up front; otherwise the SDK lazily picks up whatever key the global
+                # configuration holds at the model's first generate_content call
+                model._client = client
+            self._models.set((key, system_instruction), model) # Refreshes the TTL on every use
+            return model
+
+    def call_gemini(self, prompt: str, image_data: str = None, is_chat: bool = False, history: List = None, stream: bool = False, system_instruction: Optional[str] = None) -> Optional[Any]:
+        """
+        Runs a generation with key rotation and Groq fallback.
+        With `stream=True` (plain text prompts only) the response is streamed and consumed inside the
+        rotation loop, so a rate limit hit mid-stream still rotates to the next key.
+        `system_instruction` carries a static preamble: it is sent ahead of every prompt as an identical
+        prefix, which lets Gemini's implicit context caching reuse it across calls.
+        """
         # CIRCUIT BREAKER CHECK
         # If Gemini failed recently (all keys exhausted), skip meaningful attempts and go straight to fallback.
         if self.circuit_open:
             if time.time() - self.circuit_open_time < self.circuit_breaker_timeout:
                 print(f"⚠️ Gemini Circuit Open (Skipping Gemini). Directing to Groq...")
-                return self._call_groq_fallback(prompt, is_chat, history)
+                return self._call_groq_fallback(prompt, is_chat, history, system_instruction)
             else:
                 print("Checking Gemini Circuit Reset (Timeout passed)...")
                 self.circuit_open = False # Try again after timeout
@@ -83,15 +150,8 @@ class GeminiHandler:
             key = self.api_keys[idx]
             
             try:
-                genai.configure(api_key=key)
-                model = genai.GenerativeModel(self.model_name)
-                
-                safety_settings = [
-                    { "category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_NONE" },
-                    { "category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_NONE" },
-                    { "category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_NONE" },
-                    { "category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_NONE" },
-                ]
+                model = self._get_model(key, system_instruction)
+                safety_settings = SAFETY_SETTINGS
 
                 if image_data:
                     # Vision request
@@ -101,6 +161,8 @@ class GeminiHandler:
                 elif is_chat:
                     chat_session = model.start_chat(history=history or [])
                     response = chat_session.send_message(prompt)
+                elif stream:
+                    response = _consume_stream(model.generate_content(prompt, safety_settings=safety_settings, stream=True))
                 else:
                     response = model.generate_content(prompt, safety_settings=safety_settings)
                 
@@ -131,7 +193,7 @@ class GeminiHandler:
         self.circuit_open = True
         self.circuit_open_time = time.time()
         
-        return self._call_groq_fallback(prompt, is_chat, history)
+        return self._call_groq_fallback(prompt, is_chat, history, system_instruction)
 
 # Singleton instance for easy import
 gemini_client = GeminiHandler()
@@ -0,0 +1,113 @@
+import os
+import hashlib
+import functools
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import orjson
+from core.ttl_cache import LRUCache
+
+# Backend/core/llm_cache.py
+
+# Content-addressable cache for LLM responses: identical prompts for deterministic extraction calls
+# (resume parsing, job ratings...) are answered from here instead of re-hitting the model. Callers opt in
+# per call; generators meant to vary between calls (assessments, roadmaps, analyses) never hit it.
+# The in-memory tier is always on; setting LLM_CACHE_DIR adds a file-backed tier that survives restarts
+# and is shared between workers.
+LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR")
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+_MEMORY_CACHE = LRUCache(max_size=int(os.getenv("LLM_CACHE_SIZE", "256")), ttl=LLM_CACHE_TTL)
+_CACHE_PATH: Optional[Path] = None
+if LLM_CACHE_DIR:
+    _CACHE_PATH = Path(LLM_CACHE_DIR)
+    _CACHE_PATH.mkdir(parents=True, exist_ok=True)
+    print(f"✅ LLM response cache persisted in {_CACHE_PATH}")
+
+class CachedResponse:
+    """Stand-in for a model response served from cache; exposes `.text` like the SDK and Groq responses."""
+    __slots__ = ("text", "prompt_feedback")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.prompt_feedback = None
+
+def cache_key(version: str, model: str, prompt: str, system_instruction: Optional[str] = None) -> str:
+    return hashlib.sha256(f"{version}\x00{model}\x00{system_instruction or ''}\x00{prompt}".encode("utf-8")).hexdigest()
+
+def _disk_get(key: str) -> Optional[str]:
+    path = _CACHE_PATH / f"{key}.json"
+    try:
+        entry = orjson.loads(path.read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        return None
+    cached_at = datetime.fromisoformat(entry.get("cached_at", "1970-01-01T00:00:00+00:00"))
+    if (datetime.now(timezone.utc) - cached_at).total_seconds() > LLM_CACHE_TTL:
+        _disk_delete(key)
+        return None
+    return entry.get("text")
+
+def _disk_set(key: str, text: str) -> None:
+    path = _CACHE_PATH / f"{key}.json"
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        tmp_path.write_bytes(orjson.dumps({"text": text, "cached_at": datetime.now(timezone.utc).isoformat()}))
+        os.replace(tmp_path, path) # Atomic, so concurrent workers never read a half-written entry
+    except OSError as e:
+        print(f"⚠️ Could not write LLM cache entry: {e}")
+
+def _disk_delete(key: str) -> None:
+    try:
+        (_CACHE_PATH / f"{key}.json").unlink()
+    except OSError:
+        pass
+
+def cache_get(key: str) -> Optional[str]:
+    text = _MEMORY_CACHE.get(key)
+    if text is None and _CACHE_PATH is not None:
+        text = _disk_get(key)
+        if text is not None:
+            _MEMORY_CACHE.set(key, text)
+    return text
+
+def cache_set(key: str, text: str) -> None:
+    _MEMORY_CACHE.set(key, text)
+    if _CACHE_PATH is not None:
+        _disk_set(key, text)
+
+def cache_delete(key: str) -> None:
+    _MEMORY_CACHE.delete(key)
+    if _CACHE_PATH is not None:
+        _disk_delete(key)
+
+def llm_cache(version: str, model: str, validate: Callable[[str], bool]):
+    """
+    Decorator for `(prompt, is_chat=False, history=None, ...)` model call functions.
+    Only single-shot (non-chat) calls made with `cache=True` are cached, looked up by
+    sha256(version, model, system instruction, prompt); every other call goes straight to the model.
+    Only responses that pass `validate` are stored, and hits are re-validated so a stale or corrupt
+    entry is evicted and re-fetched instead of being returned. Bump `version` whenever prompt templates change.
+    """
+    def decorator(func: Callable[..., Optional[Any]]) -> Callable[..., Optional[Any]]:
+        @functools.wraps(func)
+        def wrapper(prompt: str, is_chat: bool = False, history: Optional[list] = None, cache: bool = False, **kwargs) -> Optional[Any]:
+            if not cache or is_chat or history:
+                return func(prompt, is_chat=is_chat, history=history, **kwargs)
+
+            key = cache_key(version, model, prompt, kwargs.get("system_instruction"))
+            cached_text = cache_get(key)
+            if cached_text is not None:
+                if validate(cached_text):
+                    return CachedResponse(cached_text)
+                cache_delete(key)
+
+            response = func(prompt, is_chat=is_chat, history=history, **kwargs)
+            try:
+                text = response.text if response is not None else None
+            except Exception: # Blocked/empty responses raise on .text
+                text = None
+            if text and validate(text):
+                cache_set(key, text)
+            return response
+        return wrapper
+    return decorator
@@ -1,13 +1,18 @@
 import os
-import json
+import orjson
 from typing import Optional, Dict, Any
 from groq import Groq
 
 # Backend/core/portfolio_core.py
 
+_PROMPT_EXCLUDED_KEYS = ('raw_text', 'resume_metadata')
+
 def generate_portfolio_website(resume_json: Dict[str, Any]) -> Optional[str]:
     try:
-        resume_str = json.dumps(resume_json, indent=2)
+        # Compact JSON (no indent whitespace to bill); raw_text duplicates the structured sections and the
+        # metadata is irrelevant to the site, so neither is sent. default=str covers Firestore timestamps.
+        resume_data = {k: v for k, v in resume_json.items() if k not in _PROMPT_EXCLUDED_KEYS}
+        resume_str = orjson.dumps(resume_data, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
         prompt = f"""
         You are an expert frontend developer. Create a stunning, responsive, single-file 
         Personal Portfolio Website based on the user's resume data:
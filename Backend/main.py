@@ -1,5 +1,6 @@
 import os
 import json
+import orjson
 import sys
 from pathlib import Path
 from fastapi import FastAPI
@@ -19,7 +20,7 @@ if not firebase_admin._apps:
         project_id = "ai-career-coach-70a8d" # Fallback
         
         if firebase_creds:
-            cred_dict = json.loads(firebase_creds)
+            cred_dict = orjson.loads(firebase_creds)
             project_id = cred_dict.get("project_id", project_id)
             cred = credentials.Certificate(cred_dict)
             print("✅ Loaded credentials from environment variable.")
@@ -194,6 +195,11 @@ async def root():
 async def ping():
     return {"status": "awake"}
 
+@app.on_event("shutdown")
+async def close_http_sessions():
+    from core.adzuna_client import close_client
+    await close_client()
+
 # ------------------------------
 # Keep-Alive Service
 # ------------------------------
@@ -49,7 +49,7 @@ async def start_assessment_endpoint(
     
     try:
         # Generate questions using AI_CORE
-        questions_output = generate_assessment_questions(
+        questions_output = await generate_assessment_questions(
             assessment_type=request.assessment_type,
             skills=request.skills,
             target_role=request.target_role,
@@ -58,7 +58,7 @@ async def start_assessment_endpoint(
         if not questions_output or not questions_output.get('questions'):
             raise HTTPException(status_code=500, detail="AI failed to generate assessment questions.")
         
-        db.record_assessment_taken(uid)
+        await db.record_assessment_taken(uid)
         increment_tier_usage(user) # Increment verified tier usage
         return {"questions": questions_output['questions']}
         
@@ -79,7 +79,7 @@ async def submit_assessment_endpoint(
         # Convert List[UserAnswer] to List[Dict] for ai_core function
         submitted_answers_as_dicts = [ans.dict() for ans in request.answers] # <--- CRITICAL FIX HERE
 
-        results_output = evaluate_assessment_answers(
+        results_output = await evaluate_assessment_answers(
             user_id=uid,
             submitted_answers=submitted_answers_as_dicts, # Pass the list of dictionaries
             # original_questions=original_assessment_data.get('questions') # Pass if needed for evaluation
@@ -88,7 +88,7 @@ async def submit_assessment_endpoint(
             raise HTTPException(status_code=500, detail="AI failed to evaluate assessment answers.")
         
         
-        db.save_assessment_result(uid, results_output)
+        await db.save_assessment_result(uid, results_output)
         
         return results_output
     except Exception as e:
@@ -60,6 +60,7 @@ async def signup_with_email(user_data: UserCreate, db: DatabaseManager = Depends
                 'summary': None,
                 'optimized_summary': None
             },
+            'stats': {'score': 0}, # Indexed leaderboard score; users without it aren't listed
             'createdAt': firestore.SERVER_TIMESTAMP
         })
         print(f"User profile created in Firestore for {uid}")
@@ -96,6 +97,7 @@ async def login_with_google(user_data: UserLogin, db: DatabaseManager = Depends(
                     'summary': None,
                     'optimized_summary': None
                 },
+                'stats': {'score': 0}, # Indexed leaderboard score; users without it aren't listed
                 'createdAt': firestore.SERVER_TIMESTAMP
             })
             print(f"New user created in Firestore via Google: {name} ({uid})")
@@ -4,6 +4,7 @@ from dependencies import get_db_manager, get_current_user
 from services.google_suite import GoogleSuiteService
 from core.ai_core import extract_event_details
 import json
+import orjson
 import datetime
 import asyncio
 
@@ -103,7 +104,7 @@ async def process_interview_feedback(request: FeedbackModel, user=Depends(get_cu
     
     # 2. AI Analysis
     from core.ai_core import analyze_interview_feedback
-    new_analysis = analyze_interview_feedback(current_analysis, request.feedback_text)
+    new_analysis = await analyze_interview_feedback(current_analysis, request.feedback_text)
     
     if not new_analysis:
         raise HTTPException(status_code=500, detail="AI Analysis failed")
@@ -308,7 +309,7 @@ async def create_gmail_draft(request: CreateDraftRequest, user=Depends(get_curre
     if not creds_json:
         raise HTTPException(status_code=401, detail="Google account not connected.")
         
-    creds_dict = json.loads(creds_json)
+    creds_dict = orjson.loads(creds_json)
     google_service = GoogleSuiteService(creds_dict)
     
     if not google_service.is_authenticated():
@@ -408,7 +409,7 @@ async def _background_sync_process(user_id: str, creds_json: str, db, force_sync
     SYNC_STATE[user_id] = { "status": "running", "events": [], "tasks": [], "message": "Starting sync..." }
     
     try:
-        creds_dict = json.loads(creds_json)
+        creds_dict = orjson.loads(creds_json)
         google_service = GoogleSuiteService(creds_dict)
         
         # Check Auth
@@ -3,7 +3,7 @@ from pydantic import BaseModel
 from typing import List, Dict, Optional
 
 # Corrected imports from ai_core
-from core.ai_core import get_interview_chat_response, get_interview_summary, process_audio_answer
+from core.ai_core import get_interview_chat_response, get_interview_summary, process_audio_answer_async
 from core.db_core import DatabaseManager
 from dependencies import get_db_manager, get_current_user
 from fastapi import Depends
@@ -90,7 +90,7 @@ async def analyze_video_answer(
     uid = user['uid']
     print(f"[Interview Log] User {uid} submitted answer for question #{question_count}")
     audio_content = await video_file.read()
-    feedback_data = process_audio_answer(
+    feedback_data = await process_audio_answer_async(
         audio_content=audio_content,
         question=question,
         job_description=job_description
@@ -122,7 +122,7 @@ async def summarize_interview(request: SummarizeRequest,
     if not summary_data:
         raise HTTPException(status_code=500, detail="AI failed to generate an interview summary.")
         
-    db.save_interview_result(user['uid'], summary_data)
+    await db.save_interview_result(user['uid'], summary_data)
     increment_tier_usage(user) # Increment verified tier usage
         
     return summary_data
\ No newline at end of file
@@ -4,6 +4,7 @@ from collections import defaultdict
 import os
 import json
 import tempfile
+import asyncio
 
 # IMPORTANT: Local sys.path adjustment for local development imports
 current_file_dir = Path(__file__).resolve().parent
@@ -17,7 +18,7 @@ from fastapi.responses import JSONResponse
 from typing import List, Dict, Any, Optional
 
 # Import job-related core logic from new modules
-from core.adzuna_client import fetch_jobs
+from core.adzuna_client import fetch_jobs_many
 from core.job_processor import extract_skills_from_text, get_job_ratings_in_one_call
 from core.ai_core import extract_text_auto # Re-use existing text extractor from ai_core
 from core.db_core import DatabaseManager
@@ -59,7 +60,7 @@ async def upload_resume_and_find_jobs(
             file_extension = os.path.splitext(file.filename)[1].lower()
             
             # Use ai_core's extract_text_auto which handles both PDF and DOCX
-            resume_text = extract_text_auto(file_content_bytes, file_extension)
+            resume_text = await asyncio.to_thread(extract_text_auto, file_content_bytes, file_extension)
             if not resume_text:
                 raise HTTPException(status_code=400, detail="Could not extract text from the uploaded resume file.")
         elif use_saved_resume:
@@ -101,75 +102,46 @@ async def upload_resume_and_find_jobs(
             return JSONResponse(content={"skills": [], "jobs": [], "message": "No relevant skills found in your resume to search for jobs."})
 
         # Fetch jobs for each skill and deduplicate
-        unique_jobs_dict = {}
+        unique_jobs_dict = {} # Key: (title, company, location), Value: (Job, matched skill)
         # Fetch up to 50 jobs in total to have a good pool for rating, adjust results_per_page
         adzuna_results_per_skill = max(1, 50 // (len(user_skills) if user_skills else 1)) 
         
-        for skill in user_skills:
-            job_results = fetch_jobs(skill, location=location, results_per_page=adzuna_results_per_skill)
+        # All skill queries are issued concurrently; results keep the order of user_skills
+        for skill, job_results in await fetch_jobs_many(user_skills, location=location, results_per_page=adzuna_results_per_skill):
             for job in job_results:
-                job_identifier = (job.get("title"), job.get("company", {}).get("display_name"), job.get("location", {}).get("display_name"))
+                job_identifier = (job.title, job.company, job.location)
                 if job_identifier not in unique_jobs_dict:
-                    job['match_skill'] = skill
-                    unique_jobs_dict[job_identifier] = job
+                    unique_jobs_dict[job_identifier] = (job, skill)
         
-        unique_jobs_list = list(unique_jobs_dict.values())
+        unique_jobs_list = [job for job, _ in unique_jobs_dict.values()]
         print(f"DEBUG: Found {len(unique_jobs_list)} unique jobs from Adzuna.")
 
         if not unique_jobs_list:
             return JSONResponse(content={"skills": user_skills, "jobs": [], "message": f"No jobs found for your skills in {location}."})
 
-        rated_jobs = get_job_ratings_in_one_call(unique_jobs_list, user_skills)
-        print(f"DEBUG: Rated {len(rated_jobs)} jobs with AI.")
-
-        # --- START: MODIFIED JOB SELECTION LOGIC ---
-        # Consolidate and select top N unique jobs (max 7)
-        
-        # Use a dict to store the best version of each unique job (by identifier)
-        # This prevents taking a lower-rated duplicate if a higher-rated one exists.
-        all_unique_rated_jobs = {} # Key: (title, company, location), Value: job_dict
-        
-        for job in rated_jobs:
-            job_identifier = (
-                job.get("title"),
-                job.get("company", {}).get("display_name"),
-                job.get("location", {}).get("display_name")
-            )
-            
-            # If job not seen, or if this instance has a higher rating, update it
-            if job_identifier not in all_unique_rated_jobs or \
-               job.get('rating', 0) > all_unique_rated_jobs[job_identifier].get('rating', 0):
-                all_unique_rated_jobs[job_identifier] = job
-
-        # Sort all uniquely identified jobs by rating in descending order
-        sorted_final_jobs_candidates = sorted(
-            list(all_unique_rated_jobs.values()),
-            key=lambda x: x.get('rating', 0),
-            reverse=True
-        )
-        
-        # Select exactly the top 7
-        final_top_jobs_selected = sorted_final_jobs_candidates[:7]
-        
-        print(f"DEBUG: Selected {len(final_top_jobs_selected)} final top jobs.")
-        # --- END: MODIFIED JOB SELECTION LOGIC ---
-
-        # Reformat the final job list for the frontend
-        formatted_jobs = []
-        for job in final_top_jobs_selected: # Use the *selected* list
-            formatted_job = {
-                "title": job.get("title", "N/A"),
-                "company": job.get("company", {}).get("display_name", "N/A"),
-                "location": job.get("location", {}).get("display_name", "N/A"),
-                "url": job.get("redirect_url", "#"),
-                "match_skill": job.get("match_skill", "N/A"), # The skill that originally matched this job
-                "rating": job.get("rating", 0),
-                "reason": job.get("reason", "No reason provided by AI.")
+        # The rating call is a blocking Gemini request; keep it off the event loop
+        ratings = await asyncio.to_thread(get_job_ratings_in_one_call, unique_jobs_list, user_skills)
+        print(f"DEBUG: Rated {len(ratings)} jobs with AI.")
+
+        # Jobs are already unique by (title, company, location), so just rank them and keep the top 7,
+        # formatted for the frontend
+        formatted_jobs = [
+            {
+                "title": job.title or "N/A",
+                "company": job.company or "N/A",
+                "location": job.location or "N/A",
+                "url": job.url or "#",
+                "match_skill": skill, # The skill that originally matched this job
+                "rating": rating.get("rating", 0),
+                "reason": rating.get("reason", "No reason provided by AI.")
             }
-            formatted_jobs.append(formatted_job)
+            for (job, skill), rating in zip(unique_jobs_dict.values(), ratings)
+        ]
+        formatted_jobs.sort(key=lambda x: x['rating'], reverse=True)
+        formatted_jobs = formatted_jobs[:7]
         
         print(f"DEBUG: Returning {len(formatted_jobs)} formatted jobs to frontend.")
-        db.record_jobs_matched(uid)
+        await db.record_jobs_matched(uid)
         increment_tier_usage(user) # Increment verified tier usage
         return JSONResponse(content={"skills": user_skills, "jobs": formatted_jobs})
 
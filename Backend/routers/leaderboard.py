@@ -44,7 +44,7 @@ async def compare_users(
     Compares two users using AI.
     """
     try:
-        comparison_result = generate_user_comparison(request.user1, request.user2)
+        comparison_result = await generate_user_comparison(request.user1, request.user2)
         if not comparison_result:
              raise HTTPException(status_code=500, detail="AI failed to generate comparison.")
         return comparison_result
@@ -260,8 +260,7 @@ async def admin_approve(utr: str, secret: str = ""):
 
     doc_ref = None
     try:
-        from core.db_core import DatabaseManager
-        _db = DatabaseManager()
+        _db = get_db_manager()
         doc_ref = _db.db.collection("pending_upgrades").document(utr)
         doc = doc_ref.get()
         if not doc.exists:
@@ -324,8 +323,7 @@ async def admin_reject(utr: str, secret: str = ""):
         raise HTTPException(status_code=403, detail="Invalid admin secret.")
 
     try:
-        from core.db_core import DatabaseManager
-        _db = DatabaseManager()
+        _db = get_db_manager()
         doc_ref = _db.db.collection("pending_upgrades").document(utr)
         doc = doc_ref.get()
         if not doc.exists:
@@ -362,8 +360,7 @@ async def admin_list_pending(secret: str = ""):
         raise HTTPException(status_code=403, detail="Invalid admin secret.")
 
     try:
-        from core.db_core import DatabaseManager
-        _db = DatabaseManager()
+        _db = get_db_manager()
         docs = _db.db.collection("pending_upgrades").where("status", "==", "pending").stream()
         rows = ""
         count = 0
@@ -1,4 +1,5 @@
 import uuid
+import asyncio
 import os
 from fastapi import APIRouter, File, UploadFile, Request, Depends, HTTPException
 from pydantic import BaseModel
@@ -19,7 +20,7 @@ async def generate_direct(
     # 1. Extract Text
     file_bytes = await file.read()
     ext = os.path.splitext(file.filename)[1].lower()
-    raw_text = extract_text_auto(file_bytes, ext) 
+    raw_text = await asyncio.to_thread(extract_text_auto, file_bytes, ext) 
     
     if not raw_text:
         raise HTTPException(status_code=400, detail="Could not extract text from file.")
@@ -65,7 +66,7 @@ async def upload_resume(file: UploadFile = File(...), user: dict = Depends(get_c
     file_bytes = await file.read()
     print(f"DEBUG: upload_resume hit. Filename: {file.filename}, Size: {len(file_bytes)} bytes")
     ext = os.path.splitext(file.filename)[1].lower()
-    raw_text = extract_text_auto(file_bytes, ext)
+    raw_text = await asyncio.to_thread(extract_text_auto, file_bytes, ext)
     if not raw_text:
         raise HTTPException(status_code=400, detail="Could not extract text")
     
@@ -171,7 +172,7 @@ async def publish_portfolio_github(
     # 1. Extract
     file_bytes = await file.read()
     ext = os.path.splitext(file.filename)[1].lower()
-    raw_text = extract_text_auto(file_bytes, ext)
+    raw_text = await asyncio.to_thread(extract_text_auto, file_bytes, ext)
     if not raw_text: raise HTTPException(status_code=400, detail="No text found")
 
     # 2. Process
@@ -3,6 +3,7 @@ from pathlib import Path as PathlibPath
 import os
 import io 
 import json
+import asyncio
 import re 
 from fastapi import APIRouter, File, UploadFile, HTTPException, Form, Depends
 from pydantic import BaseModel
@@ -26,8 +27,8 @@ if str(backend_dir) not in sys.path:
 from core.db_core import DatabaseManager
 from core.ai_core import (
     extract_text_auto,
-    get_resume_structure,
-    categorize_skills_from_text,
+    resume_fingerprint,
+    parse_resume_bundle,
     optimize_resume_json,
     optimize_for_linkedin,
     save_resume_json_to_docx,
@@ -57,7 +58,7 @@ async def get_user_optimized_resume(user_uid: str = Path(..., description="The U
         raise HTTPException(status_code=403, detail="Not authorized to access this user's resume.")
 
     try:
-        resume_data = db.fetch_resume_relational(user_uid, get_optimized=True)
+        resume_data = await db.fetch_resume_relational(user_uid, get_optimized=True)
         if not resume_data:
             raise HTTPException(status_code=404, detail="No resume data found for this user.")
         return JSONResponse(content=resume_data)
@@ -94,6 +95,9 @@ async def upload_and_process_resume(
     # Flags to track if AI calls for structure/skills were made for a saved resume
     structure_ai_called = False
     skills_ai_called = False
+    # The analysis only needs the raw text, so it is started as soon as the text is known and
+    # runs alongside structuring/skills extraction and the DB write.
+    analysis_task: Optional[asyncio.Task] = None
 
     try:
         if file and file.filename: # User is uploading a NEW resume
@@ -111,22 +115,23 @@ async def upload_and_process_resume(
                 print("ERROR: Uploaded file content is empty.")
                 raise HTTPException(status_code=400, detail="Uploaded file is empty.")
             
-            resume_text = extract_text_auto(file_content_bytes, file_extension)
+            resume_text = await asyncio.to_thread(extract_text_auto, file_content_bytes, file_extension)
             print(f"DEBUG: Text extracted, length: {len(resume_text) if resume_text else 0}")
             
             if not resume_text:
                 print("ERROR: Could not extract text from the uploaded resume file.")
                 raise HTTPException(status_code=400, detail="Could not extract text from the uploaded resume file.")
             
-            final_structured_data_to_save = get_resume_structure(resume_text)
+            fingerprint = resume_fingerprint(resume_text) # Keys every downstream cache for this text
+            analysis_task = asyncio.create_task(generate_full_resume_analysis(resume_text, job_description, fingerprint=fingerprint))
+            final_structured_data_to_save, categorized_skills = await parse_resume_bundle(resume_text, fingerprint=fingerprint)
             structure_ai_called = True # AI call made for new upload
+            skills_ai_called = True # AI call made for new upload
             print(f"DEBUG: Structured data generated: {bool(final_structured_data_to_save)}")
             if not final_structured_data_to_save:
                 print("ERROR: AI failed to structure the resume.")
                 raise HTTPException(status_code=500, detail="AI failed to structure the resume from the uploaded content.")
 
-            categorized_skills = categorize_skills_from_text(resume_text)
-            skills_ai_called = True # AI call made for new upload
             if categorized_skills:
                 final_structured_data_to_save['skills'] = categorized_skills
             
@@ -158,6 +163,8 @@ async def upload_and_process_resume(
             resume_text = saved_raw_text
             file_name = saved_metadata.get('file_name', 'saved_resume.pdf')
             print(f"DEBUG: Using stored raw_resume_text '{file_name}' for user {uid}.")
+            fingerprint = resume_fingerprint(resume_text)
+            analysis_task = asyncio.create_task(generate_full_resume_analysis(resume_text, job_description, fingerprint=fingerprint))
 
             # --- OPTIMIZED FLOW: Reuse saved structured data and skills ---
             if saved_structured_resume_data and isinstance(saved_structured_resume_data, dict) and \
@@ -170,13 +177,12 @@ async def upload_and_process_resume(
                 
             else: # Fallback: If structured data or skills are missing/invalid, regenerate from raw_text
                 print("DEBUG: Saved structured data or skills missing/invalid. Re-generating from raw text.")
-                final_structured_data_to_save = get_resume_structure(resume_text)
+                final_structured_data_to_save, categorized_skills = await parse_resume_bundle(resume_text, fingerprint=fingerprint)
                 structure_ai_called = True # AI call made
+                skills_ai_called = True # AI call made
                 if not final_structured_data_to_save:
                     raise HTTPException(status_code=500, detail="AI failed to structure the saved resume from content.")
                 
-                categorized_skills = categorize_skills_from_text(resume_text)
-                skills_ai_called = True # AI call made
                 if categorized_skills:
                     final_structured_data_to_save['skills'] = categorized_skills
                 print("DEBUG: Re-generated structured resume data and skills from raw text (Gemini calls made).")
@@ -196,10 +202,10 @@ async def upload_and_process_resume(
         # we skip the heavy DB update.
         if file and file.filename: # This is a NEW upload, always perform full DB write
             print(f"DEBUG: Performing full db.update_resume_relational for new resume upload by user {uid}.")
-            success = db.update_resume_relational(user_uid=uid, parsed_data=final_structured_data_to_save)
+            success = await asyncio.to_thread(db.update_resume_relational, user_uid=uid, parsed_data=final_structured_data_to_save)
         elif structure_ai_called or skills_ai_called: # This is 'use saved', but data needed regeneration
             print(f"DEBUG: Performing full db.update_resume_relational for 'use saved' (data was regenerated) by user {uid}.")
-            success = db.update_resume_relational(user_uid=uid, parsed_data=final_structured_data_to_save)
+            success = await asyncio.to_thread(db.update_resume_relational, user_uid=uid, parsed_data=final_structured_data_to_save)
         else: # This is 'use saved', and data was fully reused (no AI calls needed)
             print(f"DEBUG: Skipping full db.update_resume_relational for 'use saved' (data fully reused). Only generating report.")
             success = True # Mark as successful operation as no DB error occurred
@@ -211,7 +217,7 @@ async def upload_and_process_resume(
 
         # --- Generate Full Resume Analysis Report (always generated for frontend display) ---
         print(f"DEBUG: Generating full resume analysis report for user {uid}.")
-        full_analysis_report = generate_full_resume_analysis(resume_text, job_description)
+        full_analysis_report = await analysis_task
         if not full_analysis_report:
             logger.warning(f"WARNING: Full resume analysis returned empty results for user {uid}.")
             full_analysis_report = {
@@ -240,7 +246,7 @@ async def upload_and_process_resume(
                      else: ats_score = 0
                 
                 job_role = full_analysis_report.get('job_role_context', job_description or "General")
-                db.save_ats_score_history(uid, ats_score, job_role)
+                await db.save_ats_score_history(uid, ats_score, job_role)
             except Exception as e:
                 print(f"ERROR: Failed to save ATS score history: {e}")
 
@@ -248,7 +254,7 @@ async def upload_and_process_resume(
         
         # NEW: Record this as an optimization/analysis event so the Dashboard stats update.
         # The button says "Analyze & Optimize", so users expect this to count.
-        db.record_resume_optimization(uid)
+        await db.record_resume_optimization(uid)
         increment_tier_usage(user)
 
         return JSONResponse(content={
@@ -264,7 +270,9 @@ async def upload_and_process_resume(
         logger.error(f"Unexpected error in /upload for user {uid}: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error during resume processing: {str(e)}")
     finally:
-        pass 
+        # Drop the in-flight analysis if the request failed before it was awaited
+        if analysis_task is not None and not analysis_task.done():
+            analysis_task.cancel()
 
 @router.post("/optimize")
 async def optimize_resume(request_data: OptimizeRequest, user: dict = Depends(get_current_user),
@@ -272,14 +280,14 @@ async def optimize_resume(request_data: OptimizeRequest, user: dict = Depends(ge
     uid = user['uid']
     
     try:
-        resume_to_optimize = db.fetch_resume_relational(uid, get_optimized=False)
+        resume_to_optimize = await db.fetch_resume_relational(uid, get_optimized=False)
         if not resume_to_optimize:
             raise HTTPException(status_code=404, detail="Resume not found for this user.")
         
-        optimized_data = optimize_resume_json(resume_to_optimize, request_data.user_request, job_description=request_data.job_description)
+        optimized_data = await optimize_resume_json(resume_to_optimize, request_data.user_request, job_description=request_data.job_description)
         
-        db.update_optimized_resume_relational(uid, optimized_data)
-        db.record_resume_optimization(uid)
+        await db.update_optimized_resume_relational(uid, optimized_data)
+        await db.record_resume_optimization(uid)
         
         return JSONResponse(content={
             "message": "Optimization successful",
@@ -296,11 +304,11 @@ async def optimize_linkedin_profile(request_data: OptimizeRequest, user: dict =
     uid = user['uid']
 
     try:
-        resume_data = db.fetch_resume_relational(uid, get_optimized=False)
+        resume_data = await db.fetch_resume_relational(uid, get_optimized=False)
         if not resume_data:
             raise HTTPException(status_code=404, detail="Resume not found for this user.")
         
-        linkedin_content = optimize_for_linkedin(resume_data, request_data.user_request, job_description=request_data.job_description)
+        linkedin_content = await optimize_for_linkedin(resume_data, request_data.user_request, job_description=request_data.job_description)
         if not linkedin_content:
             raise HTTPException(status_code=500, detail="AI failed to generate LinkedIn content.")
         
@@ -318,7 +326,7 @@ async def download_resume(user_uid: str = Path(..., description="The UID of the
         raise HTTPException(status_code=403, detail="Not authorized to download this user's resume.")
 
     try:
-        final_data_for_doc = db.fetch_resume_relational(user_uid, get_optimized=True)
+        final_data_for_doc = await db.fetch_resume_relational(user_uid, get_optimized=True)
         if not final_data_for_doc:
             raise HTTPException(status_code=404, detail="Could not find optimized resume data for this user.")
         
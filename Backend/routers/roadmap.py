@@ -191,12 +191,12 @@ async def generate_roadmap_endpoint(
 ):
     uid = user['uid']
     try:
-        roadmap_output_raw = generate_career_roadmap(request.dict())
+        roadmap_output_raw = await generate_career_roadmap(request.dict())
         if not roadmap_output_raw:
             raise HTTPException(status_code=500, detail="AI failed to generate a career roadmap.")
         roadmap_output = initialize_roadmap_progress(roadmap_output_raw)
         await db.save_user_roadmap(uid, roadmap_output)
-        db.record_roadmap_generation(uid)
+        await db.record_roadmap_generation(uid)
         increment_tier_usage(user) # Record usage increment
         return roadmap_output
     except HTTPException:
@@ -232,7 +232,7 @@ async def update_roadmap_task_status_endpoint(request: TaskStatusUpdateRequest,
 @router.post("/tutor")
 async def get_tutor_response_endpoint(request: TutorRequest, user: dict = Depends(get_current_user)):
     try:
-        tutor_response = get_tutor_explanation(request.topic)
+        tutor_response = await get_tutor_explanation(request.topic)
         if not tutor_response:
             raise HTTPException(status_code=500, detail="AI tutor failed to provide an explanation.")
         return tutor_response
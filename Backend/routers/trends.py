@@ -5,7 +5,7 @@ from pytrends.request import TrendReq
 from dependencies import get_db_manager, get_current_user
 from core.db_core import DatabaseManager
 from core.ai_core import generate_skill_trends_analysis
-from core.bigquery_client import BigQueryClient
+from core.bigquery_client import get_bigquery_client
 import logging
 
 router = APIRouter()
@@ -112,7 +112,6 @@ async def sync_trends_to_bigquery():
         logger.warning(f"Google Trends Sync Failed ({e}). Generating SYNTHETIC data for BigQuery demo.")
         
         # 2. Fallback: Generate Synthetic Data
-        import pandas as pd
         import numpy as np
         
         # Create 5 years of weekly dates
@@ -133,26 +132,21 @@ async def sync_trends_to_bigquery():
     if df is None or df.empty:
          return {"success": False, "message": "Failed to acquire data (Real or Synthetic)."}
 
-    rows = []
-    for index, row in df.iterrows():
-        date_val = row['date']
-        for kw in keywords:
-            if kw in row:
-                rows.append({
-                    "date": date_val,
-                    "keyword": kw,
-                    "interest_value": int(row[kw])
-                })
-    
-    bq_df = pd.DataFrame(rows)
+    # Wide (date x keyword) to long rows in one vectorized melt, instead of a dict per cell via iterrows
+    bq_df = df.melt(
+        id_vars=['date'],
+        value_vars=[kw for kw in keywords if kw in df.columns],
+        var_name='keyword',
+        value_name='interest_value'
+    ).astype({'interest_value': 'int64'})
     
     # 4. Load to BigQuery
     try:
-        bq_client = BigQueryClient()
+        bq_client = get_bigquery_client()
         if not bq_client.client:
              return {"success": True, "message": "Sync processing complete (BigQuery not configured - skipped load).", "rows_processed": len(bq_df)}
              
-        bq_client.load_data(bq_df)
+        await bq_client.load_data_async(bq_df)
         return {"success": True, "message": f"Successfully loaded {len(bq_df)} rows into BigQuery."}
         
     except Exception as e:
@@ -165,7 +159,7 @@ async def get_long_term_viability():
     Returns the Long-Term Viability analysis from BigQuery.
     """
     try:
-        bq_client = BigQueryClient()
+        bq_client = get_bigquery_client()
         if not bq_client.client:
              # Fallback if BQ not configured
              logger.warning("BigQuery not configured. Returning mock viability data.")
@@ -1,4 +1,5 @@
 import sys
+import asyncio
 from pathlib import Path
 
 # IMPORTANT: Ensure the 'backend' directory is on sys.path for local development
@@ -12,7 +13,7 @@ from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 from typing import Dict, Any, Optional
 
-from core.db_core import DatabaseManager # Import the class for type hinting
+from core.db_core import DatabaseManager, LEADERBOARD_SCORE_STATS # Import the class for type hinting
 from dependencies import get_db_manager, get_current_user # CRITICAL: Import from dependencies (now relative)
 
 router = APIRouter()
@@ -29,7 +30,7 @@ async def get_user_profile(
     try:
         uid = user['uid']
         
-        resume_data = db.fetch_resume_relational(user_uid=uid, get_optimized=False)
+        resume_data = await db.fetch_resume_relational(user_uid=uid, get_optimized=False)
         
         # Fetch subscription details from the users collection
         user_doc = db.db.collection('users').document(uid).get()
@@ -80,7 +81,7 @@ async def update_user_resume_details(
 
         # Now we call the database function with the correctly structured data.
         # It only expects uid and the data dictionary.
-        success = db.update_resume_relational(uid, data_to_save)
+        success = await asyncio.to_thread(db.update_resume_relational, uid, data_to_save)
         
         if not success:
             raise HTTPException(status_code=500, detail="Failed to update resume details in the database.")
@@ -106,12 +107,12 @@ async def get_user_stats(
         raise HTTPException(status_code=404, detail="User profile not found.")
     
     user_data = user_doc.to_dict()
-    # Safely get stats, defaulting to 0 if not present
-    stats = user_data.get('stats', {
-        'roadmaps_generated': 0,
-        'resumes_optimized': 0,
-        'assessments_taken': 0,
-        'jobs_matched': 0
-    })
+    stored_stats = user_data.get('stats') or {}
+    # Every stored counter except the internal leaderboard score; the leaderboard counters default to 0
+    # when not present (they are only written once incremented)
+    stats = {
+        **dict.fromkeys(LEADERBOARD_SCORE_STATS, 0),
+        **{stat: value for stat, value in stored_stats.items() if stat != 'score'}
+    }
 
     return stats
\ No newline at end of file
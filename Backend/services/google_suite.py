@@ -1,5 +1,5 @@
 import os
-import json
+import orjson
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import Flow
 from google.auth.transport.requests import Request
@@ -41,14 +41,14 @@ class GoogleSuiteService:
         client_secret_env = os.environ.get("GOOGLE_CLIENT_SECRET")
         if client_secret_env:
             try:
-                client_config = json.loads(client_secret_env)
+                client_config = orjson.loads(client_secret_env)
                 flow = Flow.from_client_config(
                     client_config,
                     scopes=SCOPES,
                     redirect_uri=redirect_uri
                 )
                 return flow
-            except json.JSONDecodeError:
+            except orjson.JSONDecodeError:
                 print("❌ Error: GOOGLE_CLIENT_SECRET is not valid JSON.")
         
         # 2. Fallback to Local File